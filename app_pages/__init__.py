@@ -0,0 +1,23 @@
+import importlib
+
+from app_pages.shared import is_admin
+
+# Module rendering each page. A page's module is imported the first time the
+# page is shown, so its dependencies (pandas, pyarrow, fpdf, streamlit-webrtc,
+# the catalogue) load with it instead of delaying every worker's first paint.
+PAGE_MODULES = {
+    "Scanning": "app_pages.scanning",
+    "Management": "app_pages.management",
+    "History": "app_pages.history",
+    "Delivery": "app_pages.delivery",
+    "Premium": "app_pages.premium",
+    "Family Plan": "app_pages.family_plan",
+    "Metrics": "app_pages.metrics_dashboard",
+}
+
+
+# Page content rendering
+def render_page(selected):
+    if selected == "Metrics" and not is_admin():
+        return
+    importlib.import_module(PAGE_MODULES[selected]).render()
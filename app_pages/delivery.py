@@ -0,0 +1,81 @@
+import streamlit as st
+
+from app_pages.shared import current_user, get_storage, searched_medication
+from orders import OrderProcessor
+
+MAX_SHOWN_ORDERS = 5  # Most recent orders shown on the Delivery page
+
+# Shared background order processor (one thread pool per process), recording completed orders in storage
+@st.cache_resource
+def get_order_processor():
+    return OrderProcessor(storage=get_storage())
+
+# Function for this session's most recent orders the processor still knows, newest first
+def shown_jobs():
+    processor = get_order_processor()
+    jobs = [(job_id, processor.get(job_id)) for job_id in reversed(st.session_state.order_jobs[-MAX_SHOWN_ORDERS:])]
+    return [(job_id, job) for job_id, job in jobs if job is not None]
+
+# Function to show this session's orders
+def display_order_jobs(jobs):
+    for job_id, job in jobs:
+        st.write("-"*50)
+        if not job.finished:
+            st.write(f"Processing Order for **{job.medication_name}**...")
+            st.progress(job.progress)  # Progress reported by the worker
+        elif job.status == "failed":
+            st.error(f"Order failed: {job.error}")
+        else:
+            st.markdown("**Order Summary**")
+            # Display the order data as a table
+            st.table(job.order_df)
+
+            # Display total cost
+            st.write(f"**Total Cost: ${job.total_cost:.2f}**")
+            st.success("Order placed successfully!")
+
+            # Download button
+            st.download_button("Download Receipt", job.receipt, "order_receipt.pdf", mime="application/pdf", key=f"receipt_{job_id}")
+
+# Function to show this session's orders while some are processing: reruns on
+# its own every half second without rerunning the rest of the page, and once
+# every order has finished reruns the page once, which stops the polling
+@st.fragment(run_every=0.5)
+def poll_order_jobs():
+    jobs = shown_jobs()
+    if all(job.finished for _, job in jobs):
+        st.rerun(scope="app")
+    display_order_jobs(jobs)
+
+def render():
+    st.title("Delivery Page")
+
+    # Automatically use the medication name from the scanned data if available
+    medication = searched_medication()
+    medication_name = medication.drug_name if medication is not None else ""
+
+    # Order Form
+    with st.form("order_form"):
+        st.subheader("Place Your Order")
+        st.write(f"Selected Medication: **{medication_name}**")
+        quantity = st.number_input("Quantity", min_value=1, step=1, value=1)
+        uploaded_file = st.file_uploader("Upload Prescription (PDF, JPG, PNG)", type=["pdf", "jpg", "png"])
+        submitted = st.form_submit_button("Place Order")
+
+    if submitted:
+        if uploaded_file:
+            # Hand the order to the background processor and keep the page responsive
+            job_id = get_order_processor().submit(current_user(), medication_name, quantity, uploaded_file.name,
+                                                  uploaded_file.getvalue())
+            if "order_jobs" not in st.session_state:
+                st.session_state.order_jobs = []
+            st.session_state.order_jobs.append(job_id)
+        else:
+            st.error("Please upload a prescription to proceed.")
+
+    if st.session_state.get("order_jobs"):
+        jobs = shown_jobs()
+        if any(not job.finished for _, job in jobs):
+            poll_order_jobs()
+        else:
+            display_order_jobs(jobs)
@@ -0,0 +1,123 @@
+import pandas as pd
+import streamlit as st
+
+from app_pages.shared import (
+    REMINDER_CHART_HOURS,
+    current_user,
+    display_cross_reference,
+    get_reminder_dispatcher,
+    get_storage,
+    schedule_reminder,
+)
+from schedule import DoseSchedule
+from storage import family_member_user
+
+LOW_STOCK_QUANTITY = 5  # Family inventory items below this are flagged
+
+# Function to remove the family members ticked in the members table (data editor callback)
+def remove_family_members(editor_key, member_ids):
+    storage = get_storage()
+    dispatcher = get_reminder_dispatcher()
+    for row, change in st.session_state[editor_key]["edited_rows"].items():
+        if change.get("remove"):
+            member_user = family_member_user(current_user(), member_ids[row])
+            for reminder in storage.list_reminders(member_user):
+                dispatcher.cancel(reminder["id"])
+            storage.remove_family_member(current_user(), member_ids[row])
+    # A fresh editor key drops the ticks, which referred to rows that are now gone
+    st.session_state.family_editor_version = st.session_state.get("family_editor_version", 0) + 1
+
+def render():
+    st.title("Family Plan")
+    st.write("Manage your family's medication tracking.")
+
+    storage = get_storage()
+    family_members = storage.list_family_members(current_user())
+
+    # Add family members if less than 5
+    if len(family_members) < 5:
+        with st.form("add_family_member"):
+            family_name = st.text_input("Family Member Name:")
+            family_age = st.number_input("Age:", min_value=0, step=1)
+            family_relation = st.text_input("Relationship:")
+            submitted = st.form_submit_button("Add Family Member")
+            if submitted:
+                member_id = storage.add_family_member(current_user(), family_name, family_age, family_relation)
+                family_members.append({"id": member_id, "name": family_name, "age": family_age, "relationship": family_relation})
+                st.success(f"Added {family_name} to the family plan.")
+    else:
+        st.error("You have reached the limit of 5 family members.")
+    
+    # Display family members in one table; ticking "Remove" deletes just that member
+    if family_members:
+        family_df = pd.DataFrame(family_members, columns=["id", "name", "age", "relationship"])
+        family_df["remove"] = False
+        editor_key = f"family_editor_{st.session_state.get('family_editor_version', 0)}"
+        st.data_editor(
+            family_df.drop(columns="id"),
+            key=editor_key,
+            hide_index=True,
+            disabled=["name", "age", "relationship"],
+            column_config={
+                "name": "Name",
+                "age": st.column_config.NumberColumn("Age"),
+                "relationship": "Relationship",
+                "remove": st.column_config.CheckboxColumn("Remove", help="Remove this member and their medications"),
+            },
+            on_change=remove_family_members,
+            args=(editor_key, family_df["id"].tolist()),
+        )
+
+        st.write("-"*50)
+        st.subheader("Member Medications")
+        with st.form("member_medication"):
+            member_names = {member["id"]: member["name"] for member in family_members}
+            member_id = st.selectbox("Family Member:", list(member_names), format_func=member_names.get)
+            member_med = st.text_input("Medication Name:")
+            member_qty = st.number_input("Quantity Available:", min_value=0, step=1)
+            set_reminder = st.checkbox("Set a reminder")
+            member_first_dose = st.time_input("First Dose Time:")
+            member_interval = st.number_input("Dose Interval (hours):", min_value=4, step=1)
+            if st.form_submit_button("Save") and member_med:
+                member_user = family_member_user(current_user(), member_id)
+                storage.set_inventory(member_user, member_med, member_qty)
+                if set_reminder:
+                    schedule_reminder(member_user, member_med, member_first_dose, member_interval)
+                st.success(f"Saved {member_med} for {member_names[member_id]}.")
+
+        # Dashboard: every member's medications and doses, one query each
+        family_inventory = storage.list_family_inventory(current_user())
+        family_reminders = storage.list_family_reminders(current_user())
+
+        if family_reminders:
+            st.subheader("Upcoming Doses")
+            doses = DoseSchedule(family_reminders, horizon_hours=REMINDER_CHART_HOURS).doses()
+            doses["member"] = doses["user"].map({reminder["user"]: reminder["member"] for reminder in family_reminders})
+            st.dataframe(
+                doses[["dose_time", "member", "medication"]],
+                hide_index=True,
+                column_config={
+                    "dose_time": st.column_config.DatetimeColumn("Dose Time", format="ddd HH:mm"),
+                    "member": "Member",
+                    "medication": "Medication",
+                },
+            )
+
+        if family_inventory:
+            st.subheader("Family Inventory")
+            inventory_df = pd.DataFrame(family_inventory)
+            inventory_df["low_stock"] = inventory_df["quantity"] < LOW_STOCK_QUANTITY
+            st.dataframe(
+                inventory_df.sort_values(["low_stock", "quantity"], ascending=[False, True])[["member", "medication", "quantity", "low_stock"]],
+                hide_index=True,
+                column_config={
+                    "member": "Member",
+                    "medication": "Medication",
+                    "quantity": st.column_config.NumberColumn("Quantity"),
+                    "low_stock": st.column_config.CheckboxColumn("Low Stock"),
+                },
+            )
+
+        # Cross-reference everything the family takes, including your own inventory
+        family_meds = [item["medication"] for item in family_inventory]
+        display_cross_reference(family_meds + storage.inventory_names(current_user()))
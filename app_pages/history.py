@@ -0,0 +1,61 @@
+import streamlit as st
+
+from app_pages.shared import current_user, get_storage, searched_medication
+from receipts import render_statement
+from schedule import DoseSchedule
+
+ORDERS_PER_PAGE = 20  # Orders per page on the History page
+DUE_SOON_MINUTES = 60  # Window for "due soon" doses on the History page
+
+def render():
+    st.title("History Page")
+    st.write("View past medication searches, reminders, and orders.")
+    
+    # Display previously searched medication
+    medication = searched_medication()
+    if medication is not None:
+        st.write(f"Previously searched medication: **{medication.drug_name}**")
+        st.write("-"*50)
+    else:
+        st.write("No medication has been searched yet.")
+    
+    storage = get_storage()
+
+    # Display previously set reminders
+    medication_reminders = storage.list_reminders(current_user())
+    if medication_reminders:
+        st.subheader("Reminder History")
+        
+        for reminder in medication_reminders:
+            # Use .get() to avoid KeyError in case the key is missing
+            medication = reminder.get("medication", "N/A")
+            first_dose_time = reminder.get("first_dose_time", "N/A")
+            next_dose_time = reminder.get("next_dose_time", "N/A")
+
+            st.write(f"Medication: **{medication}** - First Dose: {first_dose_time} - Next Dose: {next_dose_time}")
+
+        due_soon = DoseSchedule(medication_reminders, horizon_hours=DUE_SOON_MINUTES / 60).due(DUE_SOON_MINUTES)
+        if not due_soon.empty:
+            st.write(f"**Due in the next {DUE_SOON_MINUTES} minutes:**")
+            st.table(due_soon[["dose_time", "medication"]])
+    else:
+        st.write("No reminders have been set yet.")
+    
+    # Display order history (if any), one page at a time
+    order_count = storage.count_orders(current_user())
+    if order_count:
+        st.write("-"*50)
+        st.subheader("Order History")
+        page_count = (order_count + ORDERS_PER_PAGE - 1) // ORDERS_PER_PAGE
+        page = st.number_input(f"Page (of {page_count}):", min_value=1, max_value=page_count, step=1) if page_count > 1 else 1
+        for order in storage.list_orders(current_user(), ORDERS_PER_PAGE, (page - 1) * ORDERS_PER_PAGE):
+            st.write(f"Order Date: {order['order_date']} - Item: {order['item']} - Quantity: {order['quantity']} - Total Cost: ${order['total_cost']:.2f}")
+
+        # Monthly statement of every order in the selected month, rendered in memory
+        # only when the button is clicked
+        statement_month = st.selectbox("Statement Month:", storage.order_months(current_user()))
+        month_orders = storage.list_orders_in_month(current_user(), statement_month)
+        st.download_button("Download Statement", lambda: render_statement(month_orders, statement_month),
+                           f"statement_{statement_month}.pdf", mime="application/pdf")
+    else:
+        st.write("No orders have been placed yet.")
@@ -0,0 +1,139 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+from app_pages.shared import (
+    REMINDER_CHART_HOURS,
+    current_user,
+    display_cross_reference,
+    get_catalogue,
+    get_record_store,
+    get_storage,
+    schedule_reminder,
+    searched_medication,
+)
+from inventory_io import export_inventory, import_inventory
+from metrics import timer
+from schedule import DoseSchedule
+
+INVENTORY_PER_PAGE = 50  # Inventory rows per page on the Management page
+MAX_SHOWN_REJECTED = 100  # Rejected import rows listed on the page (all are downloadable)
+MAX_PICKER_OPTIONS = 50  # Medications the reminder picker offers at once
+
+# Function to import an uploaded inventory file into the user's inventory and report rejected rows
+def import_inventory_file(uploaded_file, allow_unknown):
+    catalogue_table, catalogue_version = get_catalogue()
+    record_store = get_record_store(catalogue_table, catalogue_version)
+    status = st.empty()
+    try:
+        with timer("inventory.import"):
+            imported, rejected = import_inventory(
+                get_storage(), current_user(), uploaded_file, uploaded_file.name, record_store,
+                allow_unknown=allow_unknown, progress=lambda rows: status.caption(f"{rows:,} rows read..."),
+            )
+    except ValueError as e:  # Includes CSV parser, Arrow and decoding errors
+        status.error(f"Could not read {uploaded_file.name}: {e}")
+        return
+
+    status.success(f"Imported {imported:,} rows from {uploaded_file.name}.")
+    if len(rejected):
+        st.warning(f"{len(rejected):,} rows were rejected.")
+        st.dataframe(rejected.head(MAX_SHOWN_REJECTED), hide_index=True)
+        st.download_button("Download Rejected Rows", rejected.to_csv(index=False), "rejected_inventory.csv",
+                           mime="text/csv", on_click="ignore")
+
+# Function to display one page of the user's inventory
+def display_inventory_page(storage, inventory_count):
+    page_count = (inventory_count + INVENTORY_PER_PAGE - 1) // INVENTORY_PER_PAGE
+    page = st.number_input(f"Inventory Page (of {page_count}):", min_value=1, max_value=page_count, step=1) if page_count > 1 else 1
+    st.dataframe(
+        storage.list_inventory(current_user(), INVENTORY_PER_PAGE, (page - 1) * INVENTORY_PER_PAGE),
+        hide_index=True,
+        column_config={"medication": "Medication", "quantity": st.column_config.NumberColumn("Quantity")},
+    )
+
+# Function for picking one of the user's medications. Large inventories get a
+# filter box, and the picker only ever holds the first matches.
+def pick_inventory_medication(storage, inventory_count):
+    text = ""
+    if inventory_count > MAX_PICKER_OPTIONS:
+        text = st.text_input("Find Medication:", key="reminder_med_filter").strip()
+    names = storage.inventory_names(current_user(), text, MAX_PICKER_OPTIONS + 1)
+    if len(names) > MAX_PICKER_OPTIONS:
+        st.caption(f"Showing the first {MAX_PICKER_OPTIONS} matches; type more of the name to narrow them down.")
+        names = names[:MAX_PICKER_OPTIONS]
+    return st.selectbox("Select Medication:", names)
+
+def render():
+    st.title("Medication Management")
+    
+    medication = searched_medication()
+    if medication is not None:
+        # If a medication has been searched, display its details
+        st.write(f"Managing: **{medication.drug_name}**")
+        st.write("-"*50)
+        
+        st.subheader("Medication Inventory")
+        storage = get_storage()
+        
+        med_name = st.text_input("Medication Name:")
+        med_qty = st.number_input("Quantity Available:", min_value=0, step=1)
+        if st.button("Add Medication"):
+            storage.set_inventory(current_user(), med_name, med_qty)
+            st.success(f"Added {med_name} to inventory.")
+        
+        # Whole inventories as CSV or Parquet, parsed and committed in chunks
+        with st.expander("Bulk Import / Export"):
+            uploaded_inventory = st.file_uploader("Inventory File (medication and quantity columns):", type=["csv", "parquet"])
+            allow_unknown = st.checkbox("Keep medications that are not in the catalogue")
+            if uploaded_inventory and st.button("Import Inventory"):
+                import_inventory_file(uploaded_inventory, allow_unknown)
+
+            user = current_user()  # The download callbacks run outside the script thread
+            cols = st.columns(2)
+            cols[0].download_button("Export CSV", lambda: export_inventory(storage, user, "csv"),
+                                    "inventory.csv", mime="text/csv")
+            cols[1].download_button("Export Parquet", lambda: export_inventory(storage, user, "parquet"),
+                                    "inventory.parquet", mime="application/vnd.apache.parquet")
+
+        inventory_count = storage.count_inventory(current_user())
+        if inventory_count:
+            display_inventory_page(storage, inventory_count)
+            display_cross_reference(storage.inventory_names(current_user()))
+        
+        st.write("-"*50)
+        st.subheader("Set Medication Reminder")
+        reminder_med = pick_inventory_medication(storage, inventory_count)
+
+        # Input for first dose time and dose interval
+        first_dose_time = st.time_input("First Dose Time:")
+        dose_interval = st.number_input("Dose Interval (hours):", min_value=4, step=1)
+
+        # If dose interval is less than 4, display error and don't generate the table or chart
+        if dose_interval >= 4:
+            # Button to set reminder
+            if st.button("Set Reminder"):
+                # Save the reminder
+                schedule_reminder(current_user(), reminder_med, first_dose_time, dose_interval)
+
+                # Display reminders in a table, with each one's upcoming dose
+                reminders = storage.list_reminders(current_user())
+                schedule = DoseSchedule(reminders, horizon_hours=REMINDER_CHART_HOURS)
+                reminder_df = pd.DataFrame(reminders)
+                reminder_df["next_dose_time"] = schedule.next_doses()
+                st.table(reminder_df[["medication", "first_dose_time", "dose_interval_hours", "next_dose_time"]])
+
+                # Doses per hour over the next day, one line per medication
+                st.subheader("Dose Timeline")
+                st.line_chart(schedule.timeline())
+        else:
+            st.error("Please enter a dose interval of at least 4 hours.")
+    
+    else:
+        # If no medication is searched, just show the current time
+        st.write("No medication selected. Please scan or search for medication.")
+        
+        # Display current time
+        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.write(f"Current Time: {current_time}")
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from metrics import METRICS_FILE, metrics
+
+METRICS_JSONL_FILE = 'metrics.jsonl'
+
+# Function to show the latency of every instrumented path; refreshes itself every two seconds
+@st.fragment(run_every=2)
+def display_latency_panel():
+    snapshot = metrics.snapshot()
+    if not snapshot:
+        st.write("No timings recorded yet.")
+        return
+
+    latency_df = pd.DataFrame.from_dict(snapshot, orient="index")
+    for column in ["mean", "max", "p50", "p95", "p99"]:
+        latency_df[column] *= 1000  # Seconds to milliseconds
+    st.dataframe(
+        latency_df[["count", "p50", "p95", "p99", "mean", "max"]],
+        column_config={
+            column: st.column_config.NumberColumn(column, format="%.2f ms")
+            for column in ["p50", "p95", "p99", "mean", "max"]
+        },
+    )
+    st.bar_chart(latency_df[["p50", "p95", "p99"]], stack=False)
+
+    # Distribution of the latest samples of one path
+    path = st.selectbox("Histogram of:", list(snapshot))
+    counts, edges = np.histogram(metrics.ring(path).samples() * 1000, bins=20)
+    st.bar_chart(pd.DataFrame({"samples": counts}, index=[f"{edge:.2f} ms" for edge in edges[:-1]]))
+
+# Function to display the admin-only Metrics page
+def render():
+    st.title("Metrics")
+    st.caption("Latency of the latest samples per code path. page.Scanning includes time spent streaming.")
+    display_latency_panel()
+
+    st.write("-"*50)
+    st.subheader("Export")
+    cols = st.columns(3)
+    if cols[0].button("Write Prometheus File"):
+        st.success(f"Wrote {metrics.export(METRICS_FILE)}")
+    if cols[1].button("Append JSONL Snapshot"):
+        st.success(f"Appended to {metrics.export(METRICS_JSONL_FILE)}")
+    cols[2].download_button("Download Prometheus Text", metrics.to_prometheus(), METRICS_FILE, mime="text/plain")
+
+    st.write("-"*50)
+    st.subheader("Profiling")
+    paths = list(metrics.snapshot())
+    if paths:
+        path = st.selectbox("Profile the next call of:", paths, key="profile_path")
+        if st.button("Capture"):
+            metrics.profile_next(path)
+            st.info(f"The next call of {path} will run under cProfile and tracemalloc.")
+    for path, profile in list(metrics.profiles.items()):
+        with st.expander(f"{path}: {profile['seconds'] * 1000:.1f} ms, peak {profile['peak_bytes'] / 1024:.0f} KB allocated"):
+            st.code(profile["report"])
@@ -0,0 +1,155 @@
+import time
+
+import streamlit as st
+from streamlit_option_menu import option_menu
+from streamlit_webrtc import webrtc_streamer  # Ensure this is imported for webcam streaming
+
+from app_pages.shared import get_catalogue, get_record_store, get_search_index
+from frame_cache import FrameResultCache
+from metrics import timed
+from ocr import FuzzyNameMatcher, OcrRecognizer, TesseractReader, tesseract_available
+from recognition import RecognitionPipeline
+
+# Scan page recognition settings: recognize at most every Nth frame and K frames per second
+SCAN_EVERY_N_FRAMES = 5
+SCAN_MAX_PER_SECOND = 4
+SCAN_POLL_INTERVAL = 0.2  # Seconds between checks for a new detection
+# Frames within SCAN_CACHE_DISTANCE bits (of 64) of a frame recognized in the
+# last SCAN_CACHE_TTL seconds reuse its result
+SCAN_CACHE_DISTANCE = 6
+SCAN_CACHE_TTL = 3.0
+
+# Local OCR label recognizer, shared by every session (None when Tesseract is not installed)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_label_recognizer(_index, version):
+    if not tesseract_available():
+        return None
+    return OcrRecognizer(TesseractReader(), FuzzyNameMatcher(_index))
+
+# Function for a detector of a medication in an RGB frame (runs on a recognition worker thread)
+def medication_detector(record_store, label_recognizer):
+    def detect_medication(img):
+        # Apply medication detection on the image
+        if label_recognizer is not None:
+            return label_recognizer(img)
+        if len(record_store):
+            return record_store.record(0).drug_name  # Without OCR, return the first medication
+        return None
+    return detect_medication
+
+# Function to get this session's recognition pipeline
+def get_recognition_pipeline(record_store, label_recognizer):
+    if "recognition_pipeline" not in st.session_state:
+        st.session_state.recognition_pipeline = RecognitionPipeline(
+            medication_detector(record_store, label_recognizer),
+            every_n_frames=SCAN_EVERY_N_FRAMES,
+            max_per_second=SCAN_MAX_PER_SECOND,
+            cache=FrameResultCache(max_distance=SCAN_CACHE_DISTANCE, ttl=SCAN_CACHE_TTL),
+        )
+    return st.session_state.recognition_pipeline
+
+# Function for searching medications in both datasets
+@timed("search")
+def search_medication(search_index, med_name):
+    # Exact matches first, then prefix matches, then substring matches
+    return search_index.records(search_index.search(med_name))
+
+# Function to display medication details
+def display_medication_options(record_store, search_results):
+    if search_results:
+        selected_med = st.selectbox("Select the specific medication:", [med.drug_name for med in search_results], key="med_select")
+        if selected_med:
+            # Look up the medication in the record store (one hash probe)
+            specific_med = record_store.get(selected_med)
+            return specific_med
+    else:
+        st.write("No medication found.")
+
+# Function to display a medication's details
+def display_medication_info(medication_info):
+    st.write(f"### Medication Info: ")
+    st.write(f"**Drug Name**: {medication_info.drug_name}")
+    st.write(f"**Therapeutic Class**: {medication_info.therapeutic_class}")
+    st.write(f"**Side Effects 1**: {medication_info.side_effects[0]}")
+    st.write(f"**Side Effects 2**: {medication_info.side_effects[1]}")
+    st.write(f"**Side Effects 3**: {medication_info.side_effects[2]}")
+    st.write(f"**Description**: {medication_info.use}")
+
+def render():
+    st.title("Scanning Page")
+    catalogue_table, catalogue_version = get_catalogue()
+    record_store = get_record_store(catalogue_table, catalogue_version)
+    search_index = get_search_index(record_store, catalogue_version)
+
+    selected = option_menu(
+        menu_title=None,
+        options=["Scan", "Search"],
+        icons=["camera", "search"],
+        menu_icon="cast",
+        default_index=0,
+        orientation="horizontal",
+    )
+    if selected == "Scan":
+        st.write("Use your camera to scan medication.")
+        label_recognizer = get_label_recognizer(search_index, catalogue_version)
+        if label_recognizer is None:
+            st.caption("Label reading needs Tesseract OCR (see README); a placeholder medication is shown instead.")
+        
+        if catalogue_table is not None:
+            pipeline = get_recognition_pipeline(record_store, label_recognizer)
+            webrtc_ctx = webrtc_streamer(
+                key="example", 
+                video_frame_callback=pipeline.video_frame_callback,
+                media_stream_constraints={"video": True, "audio": False},
+                video_html_attrs={"width": "100%"}
+            )
+
+            if webrtc_ctx and webrtc_ctx.state.playing:
+                pipeline.start()
+                result_placeholder = st.empty()
+                cache_placeholder = st.empty()
+                shown_name = None
+
+                # Poll the pipeline's result slot; the webrtc thread never touches the page.
+                # Leaving the page, closing the tab or stopping the stream ends this
+                # run, which stops the session's recognition workers.
+                try:
+                    while webrtc_ctx.state.playing:
+                        result = pipeline.latest()
+                        if result and result.name and result.name != shown_name:
+                            medication_info = record_store.get(result.name)
+                            if medication_info:
+                                shown_name = result.name
+                                st.session_state.searched_medication = medication_info  # Save scanned medication info
+
+                                with result_placeholder.container():
+                                    # Check if the detected name is in the second dataset as well
+                                    if medication_info.found_in_both:
+                                        st.write(f"### Detected Medication: {medication_info.drug_name} (Found in both datasets)")
+                                    else:
+                                        st.write(f"### Detected Medication: {medication_info.drug_name} (Found in one dataset only)")
+                                    display_medication_info(medication_info)
+
+                        cache_stats = pipeline.cache_stats()
+                        cache_placeholder.caption(
+                            f"Frame cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                            f"({cache_stats['hit_rate']:.0%}), ~{cache_stats['saved_seconds']:.1f}s of recognition saved"
+                        )
+                        time.sleep(SCAN_POLL_INTERVAL)
+                finally:
+                    pipeline.stop()
+            else:
+                pipeline.stop()
+
+    elif selected == "Search":
+        st.title("Search Medication")
+        search_query = st.text_input("Enter Medication Name:", key="search_query").strip()
+        if search_query:
+            search_results = search_medication(search_index, search_query)
+            selected_info = display_medication_options(record_store, search_results)
+            
+            if search_results:
+                medication_info = selected_info or search_results[0]
+                st.session_state.searched_medication = medication_info  # Save searched medication info
+                
+                display_medication_info(medication_info)
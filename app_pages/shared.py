@@ -0,0 +1,239 @@
+import datetime
+import os
+import secrets
+import uuid
+
+import streamlit as st
+
+from credentials import CredentialStore, SessionSigner
+from metrics import timer
+from reminders import InboxSink, LogFileSink, ReminderDispatcher
+from sessions import (
+    MEDICATION_KEY, SESSION_KEYS, SESSION_MAX_AGE_DAYS, SESSION_PARAM, MemorySessionStore, new_session_token,
+)
+from storage import Storage, account_of, family_member_user
+
+# Nothing here may import pandas, pyarrow or the catalogue at module level: this
+# module loads before the first paint, and the pages that need those modules
+# import them when first rendered (see benchmarks/check_startup.py)
+
+REMINDER_CHART_HOURS = 24  # Span of the dose timeline on the Management and Family Plan pages
+REMINDER_POLL_SECONDS = 5  # How often a session checks for due-dose notifications
+REMINDER_SYNC_SECONDS = 30  # How often the dispatcher picks up reminders set through other workers
+# Where session state is kept between runs: "sqlite" (the shared database, so
+# every worker process sees it) or "memory" (this process only)
+SESSION_STORE = os.environ.get("MEDAPP_SESSION_STORE", "sqlite")
+# Key signing session tokens; when unset, one is generated and kept in the
+# database so every worker process shares it
+SESSION_SECRET = os.environ.get("MEDAPP_SESSION_SECRET")
+# Usernames that see the Metrics page (comma-separated); nobody unless set
+ADMIN_USERS = {name.strip() for name in os.environ.get("MEDAPP_ADMIN_USERS", "").split(",") if name.strip()}
+
+
+# Function for the merged catalogue of both datasets and its version, loaded on
+# first use (memory-mapped when imported with import_catalogue.py, otherwise
+# merged from the CSVs once per process)
+def get_catalogue():
+    from catalogue import catalogue_signature, load_catalogue
+
+    try:
+        return load_catalogue(), catalogue_signature()
+    except Exception as e:
+        st.error(f"Error loading the datasets: {e}")
+        return None, None
+
+
+# Record store and indexes shared across reruns and sessions. With the Arrow
+# catalogue they wrap the arrays mapped from its index file, so every worker
+# process shares them; otherwise they are built once per process.
+@st.cache_resource(max_entries=2, show_spinner="Indexing medications...")
+def get_record_store(_table, version):
+    from catalogue import load_indexes
+    from record_store import RecordStore
+
+    with timer("index.record_store"):
+        return RecordStore(_table, load_indexes(version))
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing medications...")
+def get_search_index(_store, version):
+    from catalogue import load_indexes
+    from search_index import MedicationSearchIndex
+
+    with timer("index.search"):
+        return MedicationSearchIndex(_store, load_indexes(version))
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing medications...")
+def get_cross_reference(_store, version):
+    from catalogue import load_indexes
+    from interactions import CrossReferenceIndex
+
+    with timer("index.cross_reference"):
+        return CrossReferenceIndex(_store, load_indexes(version))
+
+# Function to display the therapeutic classes and side effects shared by a list of medications
+def display_cross_reference(med_names):
+    if not med_names:
+        return
+    catalogue_table, catalogue_version = get_catalogue()
+    record_store = get_record_store(catalogue_table, catalogue_version)
+    cross_reference = get_cross_reference(record_store, catalogue_version)
+
+    drug_ids = cross_reference.drug_ids(med_names)
+    duplicate_classes = cross_reference.duplicate_classes(drug_ids)
+    shared_side_effects = cross_reference.shared_side_effects(drug_ids)
+    if not duplicate_classes and not shared_side_effects:
+        return
+
+    st.subheader("Cross-Reference")
+    for therapeutic_class, ids in duplicate_classes.items():
+        names = ", ".join(record_store.record(i).drug_name for i in ids)
+        st.warning(f"Same therapeutic class ({therapeutic_class}): {names}")
+    for side_effect, ids in shared_side_effects.items():
+        names = ", ".join(record_store.record(i).drug_name for i in ids)
+        st.write(f"**Shared side effect - {side_effect}**: {names}")
+
+# Function to check whether the logged-in user may see the Metrics page
+def is_admin():
+    entitlements = current_entitlements()
+    return entitlements is not None and entitlements.username in ADMIN_USERS
+
+# Shared persistent storage for inventory, reminders, orders and family members
+@st.cache_resource
+def get_storage():
+    return Storage()
+
+# User accounts (the demo accounts are created the first time it is used)
+@st.cache_resource
+def get_credential_store():
+    store = CredentialStore(get_storage())
+    store.seed()
+    return store
+
+# Signer of session tokens, with the key every worker process shares
+@st.cache_resource
+def get_session_signer():
+    key = SESSION_SECRET or get_storage().get_secret("session_signing_key", secrets.token_hex(32))
+    return SessionSigner(key, SESSION_MAX_AGE_DAYS * 24 * 3600)
+
+# Function for the logged-in user's entitlements (username and tier), or None
+# when logged out. The session token is verified on every run, which costs one
+# HMAC; a forged or expired token logs the session out.
+def current_entitlements():
+    token = st.session_state.get("auth_token")
+    if not token:
+        return None
+    entitlements = get_session_signer().verify(token)
+    if entitlements is None:
+        del st.session_state.auth_token
+    return entitlements
+
+# Function to log in: checks the password on the credential store's hashing
+# pool and, when it matches, keeps a signed token for the session. Returns the
+# user's tier, or None when the credentials are wrong.
+def login(username, password):
+    with timer("auth.login"):
+        tier = get_credential_store().submit_login(username, password).result()
+    if tier is not None:
+        st.session_state.auth_token = get_session_signer().issue(username, tier)
+    return tier
+
+def logout():
+    st.session_state.pop("auth_token", None)
+
+# Function to get the key user data is stored under (a per-session guest id when logged out)
+def current_user():
+    entitlements = current_entitlements()
+    if entitlements is not None:
+        return entitlements.username
+    if "guest_id" not in st.session_state:
+        st.session_state.guest_id = f"guest:{uuid.uuid4().hex}"
+    return st.session_state.guest_id
+
+# Shared session store (old sessions are purged when a worker starts)
+@st.cache_resource
+def get_session_store():
+    store = MemorySessionStore() if SESSION_STORE == "memory" else get_storage()
+    store.purge_sessions(SESSION_MAX_AGE_DAYS)
+    return store
+
+# Function to restore this browser session's saved state on its first run. The
+# token travels in the URL, so a reconnect, a reload or another worker process
+# carries on where the session left off; new sessions get a fresh token.
+def restore_session():
+    if "session_token" in st.session_state:
+        return
+    token = st.query_params.get(SESSION_PARAM)
+    data = get_session_store().load_session(token) if token else None
+    if data is None:
+        token = new_session_token()
+        st.query_params[SESSION_PARAM] = token
+        data = {}
+    for key, value in data.items():
+        if key in SESSION_KEYS:
+            st.session_state[key] = value
+    if MEDICATION_KEY in data:
+        # Looked up when a page needs it, so restoring does not load the catalogue
+        st.session_state.restored_medication = data[MEDICATION_KEY]
+    st.session_state.session_token = token
+    st.session_state.saved_session = data
+
+# Function to write this session's state to the session store when it has changed
+def save_session():
+    data = {key: st.session_state[key] for key in SESSION_KEYS if key in st.session_state}
+    medication = st.session_state.get("searched_medication")
+    medication_name = medication.drug_name if medication is not None else st.session_state.get("restored_medication")
+    if medication_name:
+        data[MEDICATION_KEY] = medication_name
+    if data != st.session_state.get("saved_session"):
+        get_session_store().save_session(st.session_state.session_token, data)
+        st.session_state.saved_session = data
+
+# Function for the medication last scanned or searched in this session (None
+# when there is none), looking up one restored from the session store
+def searched_medication():
+    name = st.session_state.pop("restored_medication", None)
+    if name is not None and st.session_state.get("searched_medication") is None:
+        catalogue_table, catalogue_version = get_catalogue()
+        if catalogue_table is not None:
+            st.session_state.searched_medication = get_record_store(catalogue_table, catalogue_version).get(name)
+    return st.session_state.get("searched_medication")
+
+# Notifications of due doses waiting for each user's session
+@st.cache_resource
+def get_reminder_inbox():
+    return InboxSink(key=account_of)  # Family members' doses go to the account holder
+
+# Shared reminder dispatcher (one background thread per process, rebuilt from storage on start)
+@st.cache_resource
+def get_reminder_dispatcher():
+    dispatcher = ReminderDispatcher(get_storage(), [get_reminder_inbox(), LogFileSink()], sync_seconds=REMINDER_SYNC_SECONDS)
+    dispatcher.rebuild()
+    dispatcher.start()
+    return dispatcher
+
+# Function to show this session's due doses as toasts; reruns on its own every few seconds
+@st.fragment(run_every=REMINDER_POLL_SECONDS)
+def display_dose_notifications():
+    member_names = None
+    for notification in get_reminder_inbox().drain(current_user()):
+        whose = "your"
+        if notification.user != current_user():
+            if member_names is None:
+                member_names = {
+                    family_member_user(current_user(), member["id"]): member["name"]
+                    for member in get_storage().list_family_members(current_user())
+                }
+            whose = f"{member_names.get(notification.user, 'a family member')}'s"
+        st.toast(f"Time for {whose} **{notification.medication}** dose ({notification.dose_time:%H:%M})", icon="💊")
+
+# Function to save a reminder and hand it to the dispatcher
+def schedule_reminder(user, medication, first_dose_time, dose_interval):
+    next_dose = datetime.datetime.combine(datetime.date.today(), first_dose_time) + datetime.timedelta(hours=dose_interval)
+    reminder_id = get_storage().add_reminder(user, medication, first_dose_time, dose_interval, next_dose.time())
+    get_reminder_dispatcher().add({
+        "id": reminder_id,
+        "user": user,
+        "medication": medication,
+        "first_dose_at": datetime.datetime.combine(datetime.date.today(), first_dose_time),
+        "dose_interval_hours": dose_interval,
+    })
@@ -0,0 +1,62 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import merge_datasets  # noqa: E402
+from interactions import SIDE_EFFECT_COLUMNS, CrossReferenceIndex  # noqa: E402
+from record_store import RecordStore  # noqa: E402
+from synthetic import make_catalogue  # noqa: E402
+
+
+# The cross-reference a page would do without the index: look every item up in
+# the catalogue frame, then compare each pair of items
+def nested_scan(frame, med_names):
+    rows = [frame[frame["Drug Name"].str.lower() == name].iloc[0] for name in med_names]
+    classes, effects = {}, {}
+    for a in range(len(rows)):
+        for b in range(a + 1, len(rows)):
+            if rows[a]["Therapeutic Class"] == rows[b]["Therapeutic Class"]:
+                classes.setdefault(rows[a]["Therapeutic Class"], set()).update((a, b))
+            for effect in {rows[a][c] for c in SIDE_EFFECT_COLUMNS} & {rows[b][c] for c in SIDE_EFFECT_COLUMNS}:
+                effects.setdefault(effect, set()).update((a, b))
+    return classes, effects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory cross-reference: inverted index vs nested DataFrame scan.")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per synthetic dataset")
+    parser.add_argument("--inventory", type=int, nargs="+", default=[5, 20, 100])
+    args = parser.parse_args()
+
+    frame = merge_datasets(make_catalogue(args.rows))
+    store = RecordStore(pa.Table.from_pandas(frame, preserve_index=False))
+    start = time.perf_counter()
+    index = CrossReferenceIndex(store)
+    print(f"build over {len(store)} names: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(0)
+    print(f"{'inventory':>10} {'index ms':>10} {'scan ms':>10}")
+    for size in args.inventory:
+        names = rng.sample(store.names, size)
+        start = time.perf_counter()
+        for _ in range(20):
+            ids = index.drug_ids(names)
+            index.duplicate_classes(ids)
+            index.shared_side_effects(ids)
+        index_ms = (time.perf_counter() - start) * 1000 / 20
+        scan_ms = float("nan")
+        if size <= 20:
+            start = time.perf_counter()
+            nested_scan(frame, names)
+            scan_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:>10} {index_ms:>10.3f} {scan_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
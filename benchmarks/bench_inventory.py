@@ -0,0 +1,83 @@
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import merge_datasets  # noqa: E402
+from inventory_io import export_inventory, import_inventory  # noqa: E402
+from record_store import RecordStore  # noqa: E402
+from storage import Storage  # noqa: E402
+from synthetic import make_catalogue  # noqa: E402
+
+
+# Function for a CSV stock list: mostly catalogue names in assorted case and
+# spacing, with a share of unknown names and bad quantities
+def make_inventory_csv(store, lines, rng, bad_share=0.02):
+    rows = ["medication,quantity"]
+    for _ in range(lines):
+        roll = rng.random()
+        name = store.names[rng.randrange(len(store.names))]
+        if roll < bad_share / 2:
+            rows.append(f"Unlisted {rng.randrange(10**6)},{rng.randint(1, 99)}")
+        elif roll < bad_share:
+            rows.append(f"{name},n/a")
+        else:
+            rows.append(f"  {name.upper() if roll < 0.5 else name} ,{rng.randint(0, 500)}")
+    return ("\n".join(rows) + "\n").encode("utf-8")
+
+
+# The Management page's one-at-a-time path: look each line up, then upsert it
+def row_by_row(storage, user, data, store):
+    imported = 0
+    for line in data.decode("utf-8").splitlines()[1:]:
+        name, _, quantity = line.rpartition(",")
+        record = store.get(name)
+        if record is not None and quantity.isdigit():
+            storage.set_inventory(user, record.drug_name, int(quantity))
+            imported += 1
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk inventory import: chunked vectorized validation and upsert vs row by row.")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows per synthetic dataset")
+    parser.add_argument("--lines", type=int, default=100000, help="Lines in the uploaded stock list")
+    parser.add_argument("--row-by-row-lines", type=int, default=5000, help="Lines timed through the one-at-a-time path")
+    args = parser.parse_args()
+
+    store = RecordStore(pa.Table.from_pandas(merge_datasets(make_catalogue(args.rows)), preserve_index=False))
+    data = make_inventory_csv(store, args.lines, random.Random(0))
+    directory = tempfile.mkdtemp()
+    storage = Storage(os.path.join(directory, "bench.db"))
+
+    for label in ("insert", "upsert"):  # Second pass updates every row already held
+        start = time.perf_counter()
+        imported, rejected = import_inventory(storage, "pharmacy", io.BytesIO(data), "stock.csv", store)
+        elapsed = time.perf_counter() - start
+        print(f"chunked {label}: {imported} imported, {len(rejected)} rejected in {elapsed * 1000:.0f} ms "
+              f"({args.lines / elapsed:,.0f} lines/s)")
+
+    start = time.perf_counter()
+    export = export_inventory(storage, "pharmacy", "parquet")
+    print(f"parquet export: {len(export) / 1e6:.1f} MB in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    sample = b"\n".join(data.splitlines()[:args.row_by_row_lines + 1])
+    start = time.perf_counter()
+    row_by_row(storage, "clinic", sample, store)
+    elapsed = time.perf_counter() - start
+    print(f"row by row: {args.row_by_row_lines / elapsed:,.0f} lines/s")
+
+    storage.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
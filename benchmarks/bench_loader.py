@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalogue  # noqa: E402
+from synthetic import make_catalogue  # noqa: E402
+
+
+# Function for the in-memory size of a frame in megabytes
+def frame_mb(frame):
+    return frame.memory_usage(deep=True).sum() / 1e6
+
+
+# Function for timing a callable, returning (seconds, result)
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the cached, typed loader with plain read_csv.")
+    parser.add_argument("--rows", type=int, default=300_000, help="rows per dataset")
+    parser.add_argument("--reruns", type=int, default=20, help="simulated script reruns")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for i, frame in enumerate(make_catalogue(args.rows), start=1):
+            # Real catalogue exports carry columns the app never displays
+            for column in ("substitute0", "substitute1", "Chemical Class", "Habit Forming"):
+                frame[column] = frame["Therapeutic Class"].str.title()
+            path = os.path.join(folder, f"medications_{i}.csv")
+            frame.to_csv(path, index=False)
+            paths.append(path)
+
+        plain_s, plain = timed(lambda: [pd.read_csv(path) for path in paths])
+        typed_s, typed = timed(lambda: [catalogue.read_dataset(path) for path in paths])
+        first_s, _ = timed(lambda: catalogue.load_datasets(paths))
+        rerun_s, _ = timed(lambda: [catalogue.load_datasets(paths) for _ in range(args.reruns)])
+
+        arrow_path = os.path.join(folder, "medications.arrow")
+        import_s, _ = timed(lambda: catalogue.write_catalogue(catalogue.merge_datasets(typed), arrow_path))
+        mapped_s, mapped = timed(lambda: catalogue._mapped_catalogue(arrow_path, catalogue.file_signature(arrow_path)))
+        names_s, _ = timed(lambda: mapped.column("Drug Name").to_pylist())
+
+    print(f"rows per dataset: {args.rows}")
+    print(f"{'loader':<28} {'seconds':>10} {'MB':>10}")
+    print(f"{'read_csv per rerun':<28} {plain_s:>10.3f} {sum(map(frame_mb, plain)):>10.1f}")
+    print(f"{'typed read_dataset':<28} {typed_s:>10.3f} {sum(map(frame_mb, typed)):>10.1f}")
+    print(f"{'load_datasets first call':<28} {first_s:>10.3f}")
+    print(f"{'load_datasets cached rerun':<28} {rerun_s / args.reruns:>10.5f}")
+    print(f"{'merge + write Arrow files':<28} {import_s:>10.3f}")
+    print(f"{'memory-map Arrow catalogue':<28} {mapped_s:>10.5f} {mapped.get_total_buffer_size() / 1e6:>10.1f}")
+    print(f"{'  read names column':<28} {names_s:>10.3f}")
+    print("(mapped MB are shared page-cache pages, not private to the process)")
+
+
+if __name__ == "__main__":
+    main()
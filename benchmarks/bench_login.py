@@ -0,0 +1,125 @@
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credentials import LOGIN_WORKERS, CredentialStore, SessionSigner, hash_password, verify_password  # noqa: E402
+from storage import Storage  # noqa: E402
+
+
+# Function for p50 and p99 of a list of seconds, in milliseconds
+def percentiles_ms(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+# Function for a rerun that does no auth work beyond verifying its token, as
+# a logged-in session's sidebar does: returns its latency in seconds
+def rerun(signer, token):
+    start = time.perf_counter()
+    signer.verify(token)
+    sum(i * i for i in range(2000))  # Stand-in for the rest of a light rerun
+    return time.perf_counter() - start
+
+
+# Function for `sessions` concurrent sessions each logging in `logins` times
+# (every fourth attempt with a wrong password) while other sessions keep
+# rerunning. `workers` is the hashing pool size; None hashes on each session's
+# own thread. Returns logins/s, login latency and rerun latency.
+def run(store, signer, users, sessions, logins, workers):
+    if workers is not None:
+        store = CredentialStore(store.storage, workers=workers)
+    token = signer.issue("user0", "prime")
+    latencies = []
+    reruns = []
+    running = True
+
+    def session(s):
+        for i in range(logins):
+            username = f"user{(s + i) % users}"
+            password = "wrong" if i % 4 == 3 else f"password-{username}"
+            start = time.perf_counter()
+            if workers is None:
+                store.check(username, password)
+            else:
+                store.submit_login(username, password).result()
+            latencies.append(time.perf_counter() - start)
+
+    def rerunning():
+        while running:
+            reruns.append(rerun(signer, token))
+            time.sleep(0.001)
+
+    background = threading.Thread(target=rerunning)
+    background.start()
+    threads = [threading.Thread(target=session, args=(s,)) for s in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    running = False
+    background.join()
+    if workers is not None:
+        store.close()
+
+    login_p50, login_p99 = percentiles_ms(latencies)
+    rerun_p50, rerun_p99 = percentiles_ms(reruns)
+    return {"logins_per_s": len(latencies) / elapsed, "login_p50_ms": login_p50, "login_p99_ms": login_p99,
+            "rerun_p50_ms": rerun_p50, "rerun_p99_ms": rerun_p99}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Login throughput under concurrent sessions: scrypt on a bounded pool vs on every session's "
+                    "thread, and the per-rerun cost of a signed token vs re-checking the password.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=32, help="sessions logging in at once")
+    parser.add_argument("--logins", type=int, default=4, help="logins per session")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    storage = Storage(os.path.join(directory, "bench.db"))
+    store = CredentialStore(storage)
+    start = time.perf_counter()
+    for u in range(args.users):
+        store.set_user(f"user{u}", f"password-user{u}", "prime")
+    hash_ms = (time.perf_counter() - start) * 1000 / args.users
+    signer = SessionSigner("bench-key", 3600)
+
+    # Per-rerun auth: verifying the session token vs deriving the tier from the password again
+    token = signer.issue("user0", "prime")
+    encoded = hash_password("password-user0")
+    calls = 20000
+    start = time.perf_counter()
+    for _ in range(calls):
+        signer.verify(token)
+    verify_us = (time.perf_counter() - start) * 1e6 / calls
+    start = time.perf_counter()
+    for _ in range(10):
+        verify_password("password-user0", encoded)
+    password_us = (time.perf_counter() - start) * 1e6 / 10
+
+    print(f"scrypt hash: {hash_ms:.1f} ms; per-rerun auth: token {verify_us:.1f} us vs password check {password_us:.0f} us")
+    print(f"{args.sessions} sessions x {args.logins} logins, {os.cpu_count()} CPUs")
+    print(f"{'hashing':<22} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'rerun p50':>10} {'rerun p99':>10}")
+    modes = [("session threads", None)] + [(f"pool of {n}", n) for n in sorted({1, 2, LOGIN_WORKERS, os.cpu_count() or 1})]
+    for label, workers in modes:
+        result = run(store, signer, args.users, args.sessions, args.logins, workers)
+        print(f"{label:<22} {result['logins_per_s']:>9.1f} {result['login_p50_ms']:>8.1f} {result['login_p99_ms']:>8.1f} "
+              f"{result['rerun_p50_ms']:>10.2f} {result['rerun_p99_ms']:>10.2f}")
+
+    store.close()
+    storage.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import load_catalogue, merge_datasets  # noqa: E402
+from ocr import FuzzyNameMatcher, TesseractReader, tesseract_available  # noqa: E402
+from record_store import RecordStore  # noqa: E402
+from search_index import MedicationSearchIndex, normalize_name  # noqa: E402
+from synthetic import make_catalogue  # noqa: E402
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# Function for simulating OCR misreads: `errors` random character substitutions
+def misread(name, errors, rng):
+    chars = list(name)
+    for _ in range(errors):
+        i = rng.randrange(len(chars))
+        chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz0123456789l1| ")
+    return "".join(chars)
+
+
+# Function for the expected drug name of every image in a folder: from
+# labels.csv (columns file, drug_name) when present, else the file name stem
+def labelled_images(folder):
+    labels = {}
+    labels_path = os.path.join(folder, "labels.csv")
+    if os.path.exists(labels_path):
+        with open(labels_path, newline="") as file:
+            labels = {row["file"]: row["drug_name"] for row in csv.DictReader(file)}
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.lower().endswith(IMAGE_SUFFIXES):
+            yield os.path.join(folder, file_name), labels.get(file_name, os.path.splitext(file_name)[0])
+
+
+# Function for printing accuracy and latency percentiles
+def report(title, correct, total, latencies_ms):
+    latencies_ms.sort()
+    print(f"{title}: accuracy {correct / total:.1%} ({correct}/{total})  "
+          f"latency ms p50 {statistics.median(latencies_ms):.2f}  "
+          f"p95 {latencies_ms[int(len(latencies_ms) * 0.95) - 1]:.2f}  max {latencies_ms[-1]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure label recognition accuracy and per-frame latency.")
+    parser.add_argument("--images", help="folder of label images (needs Tesseract)")
+    parser.add_argument("--catalogue", action="store_true", help="match against the app's catalogue in the current directory")
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic rows per dataset otherwise")
+    parser.add_argument("--samples", type=int, default=500, help="simulated misreads to match")
+    parser.add_argument("--errors", type=int, default=2, help="character errors per simulated misread")
+    args = parser.parse_args()
+
+    if args.catalogue:
+        table = load_catalogue()
+    else:
+        table = pa.Table.from_pandas(merge_datasets(make_catalogue(args.rows)), preserve_index=False)
+    store = RecordStore(table)
+    matcher = FuzzyNameMatcher(MedicationSearchIndex(store))
+    print(f"matching against {len(store)} distinct names")
+
+    # Matcher only: simulated misreads of random catalogue names
+    rng = random.Random(0)
+    correct, latencies = 0, []
+    for _ in range(args.samples):
+        expected = store.record(rng.randrange(len(store))).drug_name
+        start = time.perf_counter()
+        name, _ = matcher.match([misread(expected, args.errors, rng).split()])
+        latencies.append((time.perf_counter() - start) * 1000)
+        correct += normalize_name(name) == normalize_name(expected)
+    report(f"simulated misreads ({args.errors} errors)", correct, args.samples, latencies)
+
+    if not args.images:
+        return
+    if not tesseract_available():
+        sys.exit("Tesseract is not installed; only the simulated benchmark ran.")
+
+    from PIL import Image
+
+    reader = TesseractReader()
+    correct, total, ocr_ms, match_ms = 0, 0, [], []
+    for path, expected in labelled_images(args.images):
+        img = np.array(Image.open(path).convert("RGB"))
+        start = time.perf_counter()
+        lines = reader.read_lines(img)
+        middle = time.perf_counter()
+        name, score = matcher.match(lines)
+        end = time.perf_counter()
+        ocr_ms.append((middle - start) * 1000)
+        match_ms.append((end - middle) * 1000)
+        total += 1
+        correct += normalize_name(name) == normalize_name(expected)
+        print(f"{os.path.basename(path)}: expected {expected!r}, got {name!r} ({score:.2f})")
+    if total:
+        report("images, OCR", correct, total, ocr_ms)
+        report("images, matching", correct, total, match_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from fpdf import FPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orders import build_order_table  # noqa: E402
+from receipts import render_receipt, render_receipts, render_statement  # noqa: E402
+
+
+# The receipt path the Delivery page used before: temp file on disk, reopened for download
+def temp_file_receipt(order_df):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.multi_cell(0, 10, "Order Receipt\n\n" + order_df.to_string(index=False))
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+    pdf.output(temp_file.name)
+    with open(temp_file.name, "rb") as file:
+        data = file.read()
+    os.remove(temp_file.name)  # The app never did this; keep the benchmark from filling /tmp
+    return data
+
+
+# Function for receipts per second of a callable that renders `count` receipts
+def rate(func, count):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receipts per second: temp-file path vs in-memory renderer.")
+    parser.add_argument("--receipts", type=int, default=500)
+    args = parser.parse_args()
+
+    orders = [build_order_table(f"Medication {i}", i % 9 + 1, i % 45 + 5) for i in range(args.receipts)]
+    tables = [order_df for order_df, _ in orders]
+    history = [
+        {"order_date": f"2026-10-{i % 28 + 1:02d} 10:00:00", "item": "Medication", "quantity": i % 9 + 1, "total_cost": total}
+        for i, (_, total) in enumerate(orders)
+    ]
+
+    print(f"{'renderer':<36} {'receipts/s':>12}")
+    print(f"{'temp file + reopen (old)':<36} {rate(lambda: [temp_file_receipt(t) for t in tables], len(tables)):>12.0f}")
+    print(f"{'in-memory, one document each':<36} {rate(lambda: [render_receipt(t) for t in tables], len(tables)):>12.0f}")
+    batch = [(t, "2026-10-01 10:00:00") for t in tables]
+    print(f"{'in-memory batch, one document':<36} {rate(lambda: render_receipts(batch), len(tables)):>12.0f}")
+    print(f"{'statement rows (order_history)':<36} {rate(lambda: render_statement(history, '2026-10'), len(history)):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
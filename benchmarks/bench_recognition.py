@@ -0,0 +1,76 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_cache import FrameResultCache  # noqa: E402
+from recognition import RecognitionPipeline  # noqa: E402
+
+
+# Stand-in for a CPU-heavy recognizer: burns roughly `cost` seconds per call
+def make_recognizer(cost):
+    def recognize(img):
+        deadline = time.perf_counter() + cost
+        while time.perf_counter() < deadline:
+            img[::4, ::4].mean()
+        return "Placeholder Tablet"
+    return recognize
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed a 30 fps stream through the recognition pipeline.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--cost", type=float, default=0.15, help="recognizer seconds per frame")
+    parser.add_argument("--every", type=int, default=5)
+    parser.add_argument("--max-per-second", type=float, default=4.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache", action="store_true", help="reuse results for near-duplicate frames")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--ttl", type=float, default=3.0)
+    args = parser.parse_args()
+
+    # A box held in front of the camera: one scene plus a little sensor noise per frame
+    rng = np.random.default_rng(0)
+    scene = np.kron(rng.integers(0, 256, (18, 32, 3)), np.ones((40, 40, 1))).astype(np.int16)
+    frames = [
+        av.VideoFrame.from_ndarray(np.clip(scene + rng.integers(-8, 9, scene.shape), 0, 255).astype(np.uint8), format="rgb24")
+        for _ in range(8)
+    ]
+    cache = FrameResultCache(max_distance=args.max_distance, ttl=args.ttl) if args.cache else None
+    pipeline = RecognitionPipeline(make_recognizer(args.cost), args.every, args.max_per_second, args.workers, cache=cache)
+    pipeline.start()
+
+    callback_ms = []
+    period = 1.0 / args.fps
+    start = time.perf_counter()
+    next_frame = start
+    while time.perf_counter() - start < args.seconds:
+        begin = time.perf_counter()
+        pipeline.video_frame_callback(frames[len(callback_ms) % len(frames)])
+        callback_ms.append((time.perf_counter() - begin) * 1000)
+        next_frame += period
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    pipeline.stop()
+
+    callback_ms.sort()
+    print(f"delivered fps: {len(callback_ms) / elapsed:.1f} (target {args.fps:.0f})")
+    print(f"callback ms: p50 {statistics.median(callback_ms):.3f}  "
+          f"p99 {callback_ms[int(len(callback_ms) * 0.99) - 1]:.3f}  max {callback_ms[-1]:.3f}")
+    print(f"pipeline stats: {pipeline.stats}")
+    if cache is not None:
+        print(f"cache stats: {pipeline.cache_stats()}")
+    latest = pipeline.latest()
+    if latest:
+        print(f"last result from frame {latest.frame_no}, recognizer {latest.latency * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import datetime
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_schedule import make_reminders  # noqa: E402
+from reminders import ReminderDispatcher  # noqa: E402
+from schedule import DoseSchedule  # noqa: E402
+
+
+# Clock the benchmark moves forward by hand
+class ManualClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# Sink that counts notifications and signals once `expected` have arrived
+class CountingSink:
+    def __init__(self):
+        self.count = 0
+        self.expected = None
+        self.done = threading.Event()
+
+    def __call__(self, notification):
+        self.count += 1
+        if self.expected is not None and self.count >= self.expected:
+            self.done.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reminder dispatcher: rebuild, add/cancel and firing throughput.")
+    parser.add_argument("--reminders", type=int, default=100000)
+    parser.add_argument("--advance", type=float, default=1.0, help="Hours of doses to fire")
+    args = parser.parse_args()
+
+    reminders = make_reminders(args.reminders, users=max(1, args.reminders // 10))
+    clock = ManualClock(datetime.datetime.now().replace(microsecond=0))
+    sink = CountingSink()
+    dispatcher = ReminderDispatcher(sinks=[sink], clock=clock)
+
+    start = time.perf_counter()
+    dispatcher.rebuild(reminders)
+    print(f"rebuild {len(dispatcher)} reminders: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    extra = [dict(reminder, id=args.reminders + i) for i, reminder in enumerate(reminders[:10000])]
+    start = time.perf_counter()
+    for reminder in extra:
+        dispatcher.add(reminder)
+    print(f"add: {(time.perf_counter() - start) * 1e6 / len(extra):.1f} us each")
+    start = time.perf_counter()
+    for reminder in extra:
+        dispatcher.cancel(reminder["id"])
+    print(f"cancel: {(time.perf_counter() - start) * 1e6 / len(extra):.2f} us each")
+
+    # Count the doses due in the window, then jump the clock and time the firing
+    target = clock.now + datetime.timedelta(hours=args.advance)
+    sink.expected = len(DoseSchedule(reminders, start=clock.now, horizon_hours=args.advance).doses(end=target + datetime.timedelta(seconds=1)))
+    dispatcher.start()
+    start = time.perf_counter()
+    clock.now = target
+    with dispatcher._condition:
+        dispatcher._condition.notify()
+    sink.done.wait(timeout=60)
+    elapsed = time.perf_counter() - start
+    dispatcher.stop()
+    print(f"fired {sink.count} doses ({sink.expected} due) in {elapsed * 1000:.0f} ms: {sink.count / elapsed:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedule import DoseSchedule  # noqa: E402
+
+
+# Function for synthetic reminders spread over users, days and dose intervals
+def make_reminders(count, users, seed=0):
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    return [
+        {
+            "id": i,
+            "user": f"user{rng.randrange(users)}",
+            "medication": f"Medication {rng.randrange(500)}",
+            "first_dose_at": f"{today - datetime.timedelta(days=rng.randrange(30))}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+            "dose_interval_hours": rng.choice([4, 6, 8, 12, 24]),
+        }
+        for i in range(count)
+    ]
+
+
+# Function for the due doses by looping over reminders, as the page would without the engine
+def due_loop(reminders, now, within_minutes):
+    end = now + datetime.timedelta(minutes=within_minutes)
+    due = []
+    for reminder in reminders:
+        dose = datetime.datetime.fromisoformat(reminder["first_dose_at"])
+        interval = datetime.timedelta(hours=reminder["dose_interval_hours"])
+        while dose < now:
+            dose += interval
+        while dose < end:
+            due.append((dose, reminder["medication"]))
+            dose += interval
+    return sorted(due)
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dose schedule expansion and due-dose queries.")
+    parser.add_argument("--reminders", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--horizon", type=float, default=24 * 7, help="Hours to expand")
+    parser.add_argument("--within", type=float, default=30, help="Due-soon window in minutes")
+    args = parser.parse_args()
+
+    now = datetime.datetime.now().replace(microsecond=0)
+    print(f"{'reminders':>10} {'doses':>10} {'expand ms':>10} {'due ms':>8} {'loop due ms':>12}")
+    for count in args.reminders:
+        reminders = make_reminders(count, users=max(1, count // 10))
+        schedule, expand_ms = timed(lambda: DoseSchedule(reminders, start=now, horizon_hours=args.horizon))
+        due, due_ms = timed(lambda: schedule.due(args.within, now=now), repeat=50)
+        expected, loop_ms = timed(lambda: due_loop(reminders, now, args.within), repeat=1)
+        assert len(due) == len(expected), (len(due), len(expected))
+        print(f"{count:>10} {len(schedule):>10} {expand_ms:>10.1f} {due_ms:>8.3f} {loop_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
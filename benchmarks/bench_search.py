@@ -0,0 +1,73 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import merge_datasets  # noqa: E402
+from record_store import RecordStore  # noqa: E402
+from search_index import MedicationSearchIndex  # noqa: E402
+from synthetic import make_catalogue  # noqa: E402
+
+QUERIES = {
+    "exact": ["Zovirax Tablet", "Amoxicin 500mg Capsule"],
+    "prefix": ["a", "co", "pro", "amox"],
+    "substring": ["mg", "syrup", "zole", "sartan 40"],
+}
+
+
+# The search path main.py used before the index existed
+def pandas_search(df1, df2, med_name):
+    df1_results = df1[df1['Drug Name'].str.contains(med_name, case=False, na=False)]
+    df2_results = df2[df2['Drug Name'].str.contains(med_name, case=False, na=False)]
+    return pd.concat([df1_results, df2_results]).drop_duplicates().reset_index(drop=True)
+
+
+# Function for timing a callable, returning the median latency in milliseconds
+def median_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare indexed search with the pandas scan.")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per dataset")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    df1, df2 = make_catalogue(args.rows)
+    table = pa.Table.from_pandas(merge_datasets([df1, df2]), preserve_index=False)
+    start = time.perf_counter()
+    store = RecordStore(table)
+    print(f"record store build: {time.perf_counter() - start:.2f}s for {len(store)} distinct names")
+    start = time.perf_counter()
+    index = MedicationSearchIndex(store)
+    print(f"index build: {time.perf_counter() - start:.2f}s")
+
+
+    names = store.names[::997][:200]
+    probe = median_ms(lambda: [store.get(name) for name in names], args.repeat * 4) / len(names)
+    lookup = median_ms(lambda: [df1[df1['Drug Name'] == name] for name in names[:10]], args.repeat) / 10
+    print(f"record lookup: {probe * 1000:.1f} us per name (pandas boolean mask: {lookup * 1000:.0f} us)")
+
+    print(f"{'kind':<10} {'query':<24} {'pandas ms':>10} {'index ms':>10} {'records ms':>10}")
+    for kind, queries in QUERIES.items():
+        for query in queries:
+            scan = median_ms(lambda: pandas_search(df1, df2, query), args.repeat)
+            search = median_ms(lambda: index.search(query, args.limit), args.repeat * 20)
+            records = median_ms(lambda: index.records(index.search(query, args.limit)), args.repeat * 4)
+            print(f"{kind:<10} {query!r:<24} {scan:>10.2f} {search:>10.3f} {records:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
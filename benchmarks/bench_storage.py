@@ -0,0 +1,74 @@
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import Storage  # noqa: E402
+
+
+# Function for one simulated session: alternate inventory upserts and orders,
+# recording the latency of every write
+def session(storage, user, writes, latencies):
+    for i in range(writes):
+        start = time.perf_counter()
+        if i % 2:
+            storage.set_inventory(user, f"Medication {i % 25}", i)
+        else:
+            storage.add_order(user, f"2026-10-{i % 28 + 1:02d} 10:00:{i % 60:02d}", "Medication", i % 9 + 1, 12.5,
+                              medication=f"Medication {i % 25}", job_id=f"{user}-{i}")
+        latencies.append(time.perf_counter() - start)
+
+
+# Function for running `users` concurrent sessions against a fresh database
+def run(users, writes, max_batch):
+    directory = tempfile.mkdtemp()
+    storage = Storage(os.path.join(directory, "bench.db"), max_batch=max_batch)
+    latencies = []
+    threads = [threading.Thread(target=session, args=(storage, f"user{u}", writes, latencies)) for u in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Read side: one History page for every user
+    read_start = time.perf_counter()
+    for u in range(users):
+        storage.count_orders(f"user{u}")
+        storage.list_orders(f"user{u}", 20, 0)
+    read_ms = (time.perf_counter() - read_start) * 1000 / users
+
+    storage.close()
+    shutil.rmtree(directory)
+    latencies.sort()
+    return {
+        "writes_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "history_page_ms": read_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent write load test: group commit vs one commit per write.")
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=200, help="Writes per user")
+    args = parser.parse_args()
+
+    print(f"{args.users} users x {args.writes} writes")
+    print(f"{'mode':<24} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'page ms':>8}")
+    for label, max_batch in (("one commit per write", 1), ("group commit", 256)):
+        result = run(args.users, args.writes, max_batch)
+        print(f"{label:<24} {result['writes_per_s']:>10.0f} {result['p50_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['history_page_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+# Modules only the pages that use them may import; none may be loaded before the sidebar is drawn
+HEAVY_MODULES = ("pandas", "pyarrow", "fpdf", "streamlit_webrtc", "catalogue", "record_store", "search_index")
+IMPORT_BUDGET_MS = 600  # Cumulative import time of main.py up to drawing the sidebar (python -X importtime)
+PAINT_BUDGET_MS = 1000  # Interpreter start to the sidebar menu being drawn
+PAINT_MARKER = "-- drawing sidebar --"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+# Child process: run main.py in bare mode and stop as soon as the sidebar menu
+# is drawn, reporting when that happened and which heavy modules were loaded
+def probe():
+    sys.path.insert(0, REPO_DIR)
+    import runpy
+
+    import streamlit_option_menu
+
+    draw_menu = streamlit_option_menu.option_menu
+
+    # Heavy modules are checked before the menu is drawn: Streamlit's component
+    # call imports pandas itself, which is part of first paint but not ours to defer
+    def first_paint(*args, **kwargs):
+        heavy = sorted(set(HEAVY_MODULES) & set(sys.modules))
+        sys.stderr.write(f"{PAINT_MARKER}\n")
+        sys.stderr.flush()
+        draw_menu(*args, **kwargs)
+        json.dump({"painted_at": time.time(), "heavy": heavy}, sys.stdout)
+        sys.stdout.flush()
+        os._exit(0)  # The page itself is not part of first paint
+
+    streamlit_option_menu.option_menu = first_paint
+    runpy.run_path(os.path.join(REPO_DIR, "main.py"), run_name="__main__")
+    sys.exit("main.py finished without drawing the sidebar menu")
+
+
+# Function for running the probe in a fresh interpreter; returns (milliseconds
+# to first paint, probe report, stderr)
+def run_probe(importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [os.path.abspath(__file__), "--probe"]
+    with tempfile.TemporaryDirectory() as folder:  # The session database is created here, not in the repo
+        started = time.time()
+        child = subprocess.run(command, capture_output=True, text=True, cwd=folder)
+    if child.returncode or not child.stdout:
+        sys.stderr.write(child.stderr)
+        sys.exit("startup probe failed")
+    report = json.loads(child.stdout)
+    return (report["painted_at"] - started) * 1000, report, child.stderr
+
+
+# Function for the cumulative microseconds of every top-level import in
+# `python -X importtime` output, up to the sidebar being drawn
+def top_level_imports(stderr):
+    imports = {}
+    for match in IMPORT_LINE.finditer(stderr.split(PAINT_MARKER)[0]):
+        _, cumulative, indent, name = match.groups()
+        if not indent:
+            imports[name] = imports.get(name, 0) + int(cumulative)
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cold-start budget: import time and time to first paint of main.py in a fresh interpreter. "
+                    "Exits non-zero when a budget is exceeded or a heavy module loads before first paint.")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--paint-budget-ms", type=float, default=PAINT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="probe runs; the median time to first paint is checked")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)  # Internal: the child process
+    args = parser.parse_args()
+
+    if args.probe:
+        probe()
+        return
+
+    run_probe()  # Warm the OS file cache so runs measure Python, not the disk
+    paint_ms = statistics.median(run_probe()[0] for _ in range(args.runs))
+    _, report, stderr = run_probe(importtime=True)
+    imports = top_level_imports(stderr)
+    import_ms = sum(imports.values()) / 1000
+
+    print(f"{'import':<40} {'cumulative ms':>14}")
+    for name, micros in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40} {micros / 1000:>14.1f}")
+    print(f"imports before drawing the sidebar: {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"time to first paint (median of {args.runs}): {paint_ms:.0f} ms (budget {args.paint_budget_ms:.0f} ms)")
+
+    failures = []
+    if report["heavy"]:
+        failures.append(f"loaded before first paint: {', '.join(report['heavy'])}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"imports took {import_ms:.0f} ms")
+    if paint_ms > args.paint_budget_ms:
+        failures.append(f"first paint took {paint_ms:.0f} ms")
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("startup within budget", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
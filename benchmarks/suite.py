@@ -0,0 +1,303 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from synthetic import write_datasets  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+PDF_BYTES = b"%PDF-1.4\n%benchmark\n"
+# Differences smaller than this (in the metric's unit) are noise, not regressions
+NOISE_FLOOR = {"_s": 0.05, "_ms": 0.05, "_mb": 10}
+
+
+# Function for p50/p95/p99 and mean of a list of seconds, in milliseconds
+def latency_ms(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))] * 1000  # noqa: E731
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+            "mean_ms": statistics.fmean(samples) * 1000}
+
+
+# Function for calling func(item) on every item, returning its latency summary
+# plus calls per second
+def measure(func, items):
+    samples = []
+    start = time.perf_counter()
+    for item in items:
+        call = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - call)
+    return dict(latency_ms(samples), calls_per_s=len(items) / (time.perf_counter() - start))
+
+
+# Function for the peak resident set size of this process in MB
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3  # Bytes on macOS, KB elsewhere
+
+
+# Load the two CSVs the way the app does and import them into an Arrow file
+def bench_load(paths, folder):
+    import catalogue
+
+    timings = {}
+    start = time.perf_counter()
+    frames = [catalogue.read_dataset(path) for path in paths]
+    timings["parse_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    merged = catalogue.merge_datasets(frames)
+    timings["merge_s"] = time.perf_counter() - start
+    arrow_path = os.path.join(folder, catalogue.CATALOGUE_FILE)
+    start = time.perf_counter()
+    catalogue.write_catalogue(merged, arrow_path, catalogue.dataset_signature(paths))
+    timings["write_arrow_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    table = catalogue.load_catalogue(path=arrow_path, csv_paths=paths)
+    timings["open_mapped_s"] = time.perf_counter() - start
+    rows = sum(len(frame) for frame in frames)
+    timings["rows_per_s"] = rows / (timings["parse_s"] + timings["merge_s"] + timings["write_arrow_s"])
+    timings["catalogue_rows"] = table.num_rows
+    return timings, table
+
+
+def bench_indexes(table):
+    from interactions import CrossReferenceIndex
+    from record_store import RecordStore
+    from search_index import MedicationSearchIndex
+
+    timings = {}
+    start = time.perf_counter()
+    store = RecordStore(table)
+    timings["record_store_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    index = MedicationSearchIndex(store)
+    timings["search_index_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    cross_reference = CrossReferenceIndex(store)
+    timings["cross_reference_s"] = time.perf_counter() - start
+    timings["names"] = len(store)
+    return timings, store, index, cross_reference
+
+
+# The Search page's query mix: whole names, typed prefixes and fragments
+def bench_search(store, index, rng, queries=300):
+    names = rng.sample(store.names, min(queries, len(store.names)))
+    mix = []
+    for i, name in enumerate(names):
+        if i % 3 == 0:
+            mix.append(name)
+        elif i % 3 == 1:
+            mix.append(name[:3])
+        else:
+            middle = len(name) // 2
+            mix.append(name[max(0, middle - 2):middle + 2])
+    return measure(lambda query: index.records(index.search(query)), mix)
+
+
+def bench_cross_reference(store, cross_reference, rng, inventories=300, size=10):
+    picks = [rng.sample(store.names, min(size, len(store.names))) for _ in range(inventories)]
+
+    def check(names):
+        ids = cross_reference.drug_ids(names)
+        cross_reference.duplicate_classes(ids)
+        cross_reference.shared_side_effects(ids)
+
+    return measure(check, picks)
+
+
+# Orders end to end through the background processor, without the simulated wait
+def bench_orders(rng, orders=200):
+    from orders import OrderProcessor
+
+    processor = OrderProcessor(processing_seconds=0)
+    start = time.perf_counter()
+    job_ids = [processor.submit("bench", f"Medication {i}", rng.randint(1, 9), "prescription.pdf", PDF_BYTES) for i in range(orders)]
+    submitted = {job_id: time.perf_counter() for job_id in job_ids}
+    latencies = []
+    pending = set(job_ids)
+    while pending:
+        for job_id in list(pending):
+            if processor.get(job_id).finished:
+                latencies.append(time.perf_counter() - submitted[job_id])
+                pending.discard(job_id)
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    failed = sum(processor.get(job_id).status == "failed" for job_id in job_ids)
+    return dict(latency_ms(latencies), orders_per_s=orders / elapsed, failed=failed)
+
+
+# Concurrent synthetic sessions: each searches, stocks its inventory, sets a
+# reminder, records an order and reads its History page
+def bench_sessions(store, index, rng, folder, sessions=16, actions=25):
+    from schedule import DoseSchedule
+    from storage import Storage
+
+    storage = Storage(os.path.join(folder, "sessions.db"))
+    names = rng.sample(store.names, min(200, len(store.names)))
+    samples = []
+    lock = threading.Lock()
+
+    def session(user, seed):
+        session_rng = random.Random(seed)
+        local = []
+        for step in range(actions):
+            name = session_rng.choice(names)
+            start = time.perf_counter()
+            index.records(index.search(name[:4]))
+            storage.set_inventory(user, name, session_rng.randint(1, 30))
+            if step % 5 == 0:
+                storage.add_reminder(user, name, datetime.time(session_rng.randrange(24)), 8, datetime.time(0))
+            storage.add_order(user, f"2026-10-{step % 28 + 1:02d} 10:00:00", "Medication", 1, 10.0, medication=name)
+            storage.list_orders(user, 20, 0)
+            DoseSchedule(storage.list_reminders(user), horizon_hours=24).due(60)
+            local.append(time.perf_counter() - start)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=session, args=(f"user{i}", rng.random())) for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    storage.close()
+    return dict(latency_ms(samples), actions_per_s=len(samples) / elapsed)
+
+
+# Function for every benchmark at one catalogue size (run in a fresh process so
+# peak RSS belongs to this size alone)
+def run_size(rows, data_dir, seed):
+    paths = [os.path.join(data_dir, f"medications_{i}.csv") for i in (1, 2)]
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        results["load"], table = bench_load(paths, folder)
+        results["indexes"], store, index, cross_reference = bench_indexes(table)
+        results["search"] = bench_search(store, index, rng)
+        results["cross_reference"] = bench_cross_reference(store, cross_reference, rng)
+        results["orders"] = bench_orders(rng)
+        results["sessions"] = bench_sessions(store, index, rng, folder)
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# Function for the git commit the benchmark ran against, when available
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Function for every metric that got worse by more than `tolerance` (a share);
+# *_per_s metrics are better when higher, *_s, *_ms and *_mb when lower (and
+# only count once they are also NOISE_FLOOR worse)
+def regressions(baseline, current, tolerance):
+    found = []
+    for size, cases in current["sizes"].items():
+        for case, metrics in cases.items():
+            old_metrics = baseline.get("sizes", {}).get(size, {}).get(case)
+            if not isinstance(metrics, dict):
+                metrics, old_metrics = {"value_mb": metrics}, {"value_mb": old_metrics}
+            for metric, value in metrics.items():
+                old = (old_metrics or {}).get(metric)
+                if not old or value is None:
+                    continue
+                if metric.endswith("_per_s"):
+                    change = old / value - 1 if value else float("inf")
+                elif metric.endswith(tuple(NOISE_FLOOR)):
+                    suffix = next(suffix for suffix in NOISE_FLOOR if metric.endswith(suffix))
+                    if value - old < NOISE_FLOOR[suffix]:
+                        continue
+                    change = value / old - 1
+                else:
+                    continue
+                if change > tolerance:
+                    found.append((size, case, metric, old, value, change))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite: synthetic catalogues at several sizes driven through the app's core "
+                    "functions; writes throughput, latency and peak RSS as JSON.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="rows per dataset")
+    parser.add_argument("--overlap", type=float, default=0.2, help="share of medications_2.csv rows also in medications_1.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data", default=DATA_DIR, help="where generated CSVs are kept between runs")
+    parser.add_argument("--output", help="write the results JSON here (default: print it)")
+    parser.add_argument("--compare", help="baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a metric counts as a regression")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)  # Internal: one size, in a child process
+    args = parser.parse_args()
+
+    if args.run_size:
+        json.dump(run_size(args.run_size, args.data, args.seed), sys.stdout)
+        return
+
+    results = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "overlap": args.overlap,
+        "seed": args.seed,
+        "sizes": {},
+    }
+    for rows in args.sizes:
+        data_dir = os.path.join(args.data, str(rows))
+        start = time.perf_counter()
+        write_datasets(data_dir, rows, args.overlap, args.seed)
+        print(f"{rows} rows: datasets ready in {time.perf_counter() - start:.1f}s, running...", file=sys.stderr)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-size", str(rows), "--data", data_dir, "--seed", str(args.seed)],
+            capture_output=True, text=True,
+        )
+        if child.returncode:
+            sys.stderr.write(child.stderr)
+            sys.exit(f"benchmark at {rows} rows failed")
+        results["sizes"][str(rows)] = json.loads(child.stdout)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+        print(f"wrote {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare) as file:
+            found = regressions(json.load(file), results, args.tolerance)
+        for size, case, metric, old, new, change in found:
+            print(f"REGRESSION {size} rows {case}.{metric}: {old:.4g} -> {new:.4g} ({change:+.0%})", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import random
+
+import pandas as pd
+
+# Building blocks for realistic-looking brand names, e.g. "Zovirax 400mg Tablet"
+SYLLABLES = [
+    "a", "ab", "al", "am", "an", "ar", "az", "be", "bi", "ca", "ce", "cil", "co", "cor",
+    "da", "de", "di", "do", "du", "el", "em", "en", "ep", "er", "fa", "fe", "fen", "fi",
+    "ga", "ge", "gli", "ha", "he", "hy", "ib", "in", "ir", "ka", "ke", "la", "le", "li",
+    "lo", "lu", "ma", "me", "mi", "mo", "na", "ne", "ni", "no", "ol", "om", "on", "or",
+    "pa", "pe", "pi", "pra", "pro", "ra", "re", "ri", "ro", "sa", "se", "si", "so", "ta",
+    "te", "ti", "to", "tra", "tri", "va", "ve", "vi", "vo", "xa", "xi", "za", "ze", "zo",
+]
+ENDINGS = ["cin", "dol", "fen", "lax", "lin", "mab", "mol", "nac", "pam", "pril", "ril",
+           "sartan", "tab", "tin", "vir", "vit", "xan", "zide", "zole", "zyme"]
+STRENGTHS = ["", "5mg", "10mg", "20mg", "40mg", "50mg", "100mg", "250mg", "400mg", "500mg",
+             "625mg", "650mg", "1gm", "Plus", "Forte", "DS", "SR", "XR", "LS", "Duo"]
+FORMS = ["Tablet", "Capsule", "Syrup", "Injection", "Cream", "Drops", "Suspension",
+         "Gel", "Ointment", "Inhaler"]
+THERAPEUTIC_CLASSES = [
+    "ANTI INFECTIVES", "PAIN ANALGESICS", "CARDIAC", "GASTRO INTESTINAL", "RESPIRATORY",
+    "NEURO CNS", "ANTI DIABETIC", "DERMA", "VITAMINS MINERALS NUTRIENTS", "HORMONES",
+    "OPHTHAL", "UROLOGY", "BLOOD RELATED", "ANTI NEOPLASTICS", "GYNAECOLOGICAL",
+]
+SIDE_EFFECTS = [
+    "Nausea", "Vomiting", "Diarrhea", "Headache", "Dizziness", "Rash", "Constipation",
+    "Stomach pain", "Sleepiness", "Dry mouth", "Fatigue", "Itching", "Allergic reaction",
+    "Indigestion", "Insomnia", "Muscle pain", "Increased heart rate", "Blurred vision",
+    "Abdominal pain", "Loss of appetite", "Cough", "Swelling", "Weight gain", "Anxiety",
+]
+USES = [
+    "Treatment of Bacterial infections", "Pain relief", "Treatment of Hypertension",
+    "Treatment of Type 2 diabetes mellitus", "Treatment of Acid reflux", "Treatment of Asthma",
+    "Treatment of Allergic conditions", "Treatment of Fungal infections", "Treatment of Anxiety",
+    "Treatment of Vitamin deficiency", "Treatment of Epilepsy", "Treatment of Acne",
+]
+
+
+# Columns real catalogue exports carry that the app never displays
+EXTRA_COLUMNS = ("substitute0", "substitute1", "Chemical Class", "Habit Forming")
+
+
+# Function for generating one synthetic brand stem, e.g. "Zovirax"
+def make_brand(rng):
+    stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+    return (stem + rng.choice(ENDINGS)).capitalize()
+
+
+# Function for generating one synthetic brand name; with `brand`, a product of
+# that brand in some strength and form
+def make_drug_name(rng, brand=None):
+    name = brand or make_brand(rng)
+    strength = rng.choice(STRENGTHS)
+    parts = [name, strength, rng.choice(FORMS)] if strength else [name, rng.choice(FORMS)]
+    return " ".join(parts)
+
+
+# Function for generating catalogue rows in the CSV layout the app expects.
+# With `brands`, names are products of those brands, picked with a long-tailed
+# (Zipf-like) popularity so a few brands come in many strengths and forms, as
+# in real catalogues.
+def make_rows(count, rng, brands=None):
+    picked = [None] * count
+    if brands:
+        weights = [1 / (rank + 10) for rank in range(len(brands))]
+        picked = rng.choices(brands, weights=weights, k=count)
+    rows = []
+    for brand in picked:
+        effects = rng.sample(SIDE_EFFECTS, 3)
+        rows.append({
+            "Drug Name": make_drug_name(rng, brand),
+            "Therapeutic Class": rng.choice(THERAPEUTIC_CLASSES),
+            "sideEffect0": effects[0],
+            "sideEffect1": effects[1],
+            "sideEffect2": effects[2],
+            "use0": rng.choice(USES),
+        })
+    return rows
+
+
+# Function for generating a (df1, df2) pair of catalogues of `rows` rows each,
+# where `overlap` is the share of df2 rows copied from df1. With
+# `brand_families`, names share a long-tailed pool of brands (see make_rows).
+def make_catalogue(rows, overlap=0.2, seed=0, brand_families=False):
+    rng = random.Random(seed)
+    brands = [make_brand(rng) for _ in range(max(1, rows // 4))] if brand_families else None
+    df1 = pd.DataFrame(make_rows(rows, rng, brands))
+    shared = int(rows * overlap)
+    own = pd.DataFrame(make_rows(rows - shared, rng, brands))
+    df2 = pd.concat([df1.sample(n=shared, random_state=seed), own], ignore_index=True)
+    return df1, df2
+
+
+# Function for writing medications_1.csv and medications_2.csv of `rows` rows
+# each into `folder` (with the extra columns real exports carry); returns the
+# two paths. Existing files from the same parameters are reused.
+def write_datasets(folder, rows, overlap=0.2, seed=0, brand_families=True):
+    os.makedirs(folder, exist_ok=True)
+    paths = [os.path.join(folder, f"medications_{i}.csv") for i in (1, 2)]
+    stamp = os.path.join(folder, "parameters.txt")
+    parameters = f"rows={rows} overlap={overlap} seed={seed} brand_families={brand_families}\n"
+    if all(map(os.path.exists, paths)) and os.path.exists(stamp):
+        with open(stamp) as file:
+            if file.read() == parameters:
+                return paths
+
+    for path, frame in zip(paths, make_catalogue(rows, overlap, seed, brand_families)):
+        for column in EXTRA_COLUMNS:
+            frame[column] = frame["Therapeutic Class"].str.title()
+        frame.to_csv(path, index=False)
+    with open(stamp, "w") as file:
+        file.write(parameters)
+    return paths
@@ -0,0 +1,282 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from file_lock import FileLock
+from interactions import CrossReferenceIndex
+from metrics import timed
+from record_store import RecordStore
+from search_index import MedicationSearchIndex
+
+DATASET_FILES = ('medications_1.csv', 'medications_2.csv')
+# Merged, deduplicated catalogue written by import_catalogue.py
+CATALOGUE_FILE = 'medications.arrow'
+
+# Only the columns the app actually shows are parsed; the low-cardinality ones
+# are stored as categoricals so each distinct value is held once per frame
+COLUMN_DTYPES = {
+    'Drug Name': str,
+    'Therapeutic Class': 'category',
+    'sideEffect0': 'category',
+    'sideEffect1': 'category',
+    'sideEffect2': 'category',
+    'use0': str,
+}
+# Bitmask of the datasets a catalogue row came from: 1 = medications_1.csv,
+# 2 = medications_2.csv, 3 = both
+SOURCE_COLUMN = 'Source'
+# Schema metadata key recording dataset_signature() of the CSVs a catalogue
+# file was built from
+SIGNATURE_KEY = b'dataset_signature'
+# Schema metadata key recording file_signature() of the catalogue file an
+# index file was built from
+CATALOGUE_KEY = b'catalogue_signature'
+
+# path -> ((mtime_ns, size), content digest), kept for the life of the process
+_signatures = {}
+# Arrow file path -> (its file_signature(), its schema metadata)
+_metadata = {}
+
+
+# Function for fingerprinting a dataset file. The content is only re-hashed
+# when the file's mtime or size changes, so this is a stat() on most reruns.
+def file_signature(path):
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _signatures.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    _signatures[path] = (key, digest.hexdigest())
+    return digest.hexdigest()
+
+
+# Function for parsing one dataset file with explicit dtypes
+def read_dataset(path):
+    return pd.read_csv(path, usecols=lambda column: column in COLUMN_DTYPES, dtype=COLUMN_DTYPES)
+
+
+# Parsed once per process per file version and shared by every session, so
+# callers must treat the returned frame as read-only
+@st.cache_resource(max_entries=2 * len(DATASET_FILES), show_spinner="Loading medications...")
+def _cached_dataset(path, signature):
+    return read_dataset(path)
+
+
+# Function for loading every dataset, reparsing a file only when its content changes
+def load_datasets(paths=DATASET_FILES):
+    return tuple(_cached_dataset(path, file_signature(path)) for path in paths)
+
+
+# Function for the combined version of the datasets, used to key derived caches
+def dataset_signature(paths=DATASET_FILES):
+    return tuple(file_signature(path) for path in paths)
+
+
+# Function for merging the datasets into one deduplicated frame. Identical rows
+# are kept once, with their Source bits OR-ed together.
+def merge_datasets(frames):
+    parts = []
+    for bit, frame in enumerate(frames):
+        if frame is not None:
+            parts.append(frame.assign(**{SOURCE_COLUMN: np.uint8(1 << bit)}))
+    merged = pd.concat(parts, ignore_index=True)
+    # Categoricals with different categories would concat back to object
+    for column, dtype in COLUMN_DTYPES.items():
+        if dtype == 'category' and column in merged.columns:
+            merged[column] = merged[column].astype('category')
+
+    data_columns = [column for column in merged.columns if column != SOURCE_COLUMN]
+    keys = pd.util.hash_pandas_object(merged[data_columns], index=False)
+    source = np.zeros(len(merged), dtype=np.uint8)
+    for bit in range(len(frames)):
+        source |= keys.isin(keys[merged[SOURCE_COLUMN] == (1 << bit)]).to_numpy().astype(np.uint8) << bit
+    merged[SOURCE_COLUMN] = source
+    return merged.drop_duplicates(subset=data_columns, ignore_index=True)
+
+
+# Function for the index file kept next to a catalogue file
+# (medications.arrow -> medications.index.arrow)
+def index_path(path=CATALOGUE_FILE):
+    root, extension = os.path.splitext(path)
+    return f"{root}.index{extension}"
+
+
+# Function for writing a table as an uncompressed Arrow IPC file, the layout
+# that can be memory-mapped without decoding. The file is written next to
+# `path` and renamed over it, so workers that have the old file mapped keep
+# reading it intact and the next load maps the new one.
+def _write_arrow(table, path):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+# Function for writing a catalogue frame as an Arrow file, followed by its
+# index file. `signature` (from dataset_signature()) records which CSVs it was
+# built from.
+def write_catalogue(frame, path=CATALOGUE_FILE, signature=None):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if signature is not None:
+        metadata = dict(table.schema.metadata or {})
+        metadata[SIGNATURE_KEY] = ','.join(signature).encode('ascii')
+        table = table.replace_schema_metadata(metadata)
+    _write_arrow(table, path)
+    write_indexes(table, index_path(path), file_signature(path))
+
+
+# Function for writing the record store, search index and cross-reference
+# arrays of a catalogue table to an index file, so that worker processes map
+# them instead of each building a private copy. The file holds one row with a
+# list column per array (the list values are the array, contiguous on disk),
+# and records the file_signature() of the catalogue it belongs to.
+def write_indexes(table, path, catalogue_signature):
+    store = RecordStore(table)
+    arrays = {**store.arrays(), **MedicationSearchIndex(store).arrays(), **CrossReferenceIndex(store).arrays()}
+    columns = {name: pa.LargeListArray.from_arrays(pa.array([0, len(values)], type=pa.int64()), pa.array(values))
+               for name, values in arrays.items()}
+    index = pa.table(columns).replace_schema_metadata({CATALOGUE_KEY: catalogue_signature.encode('ascii')})
+    _write_arrow(index, path)
+
+
+# Function for the schema metadata of an Arrow file. Only the file's schema is
+# read, and only when the file has changed.
+def _schema_metadata(path):
+    key = file_signature(path)
+    cached = _metadata.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with pa.memory_map(path, 'r') as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    _metadata[path] = (key, metadata)
+    return metadata
+
+
+# Function for the dataset signature a catalogue file was built from (None
+# when it does not record one)
+def built_from(path=CATALOGUE_FILE):
+    metadata = _schema_metadata(path)
+    return tuple(metadata[SIGNATURE_KEY].decode('ascii').split(',')) if SIGNATURE_KEY in metadata else None
+
+
+# Function for checking whether the index file of a catalogue exists and was
+# built from the catalogue file as it is now
+def indexes_are_current(path=CATALOGUE_FILE):
+    indexes = index_path(path)
+    if not os.path.exists(indexes):
+        return False
+    return _schema_metadata(indexes).get(CATALOGUE_KEY) == file_signature(path).encode('ascii')
+
+
+# Function for checking whether the catalogue file exists and was built from
+# the CSVs as they are now
+def _catalogue_matches(path, csv_paths):
+    return os.path.exists(path) and built_from(path) == dataset_signature(csv_paths)
+
+
+# Function for checking whether the catalogue file and its index file are
+# both up to date with the CSVs
+def catalogue_is_current(path=CATALOGUE_FILE, csv_paths=DATASET_FILES):
+    return _catalogue_matches(path, csv_paths) and indexes_are_current(path)
+
+
+# Function for (re)building the catalogue file and its index file from the
+# CSVs unless they are current; returns whether they were built. Workers
+# starting together take turns on a lock file: the first one builds, the rest
+# wait and then map what it wrote instead of each merging its own copy.
+def build_catalogue(path=CATALOGUE_FILE, csv_paths=DATASET_FILES):
+    with FileLock(f"{path}.lock"):
+        if catalogue_is_current(path, csv_paths):
+            return False
+        signature = dataset_signature(csv_paths)  # Taken first: a CSV edited while reading triggers another build
+        write_catalogue(merge_datasets([read_dataset(csv_path) for csv_path in csv_paths]), path, signature)
+        return True
+
+
+# The Arrow file is memory-mapped rather than read: every worker process on the
+# host shares the same page-cache pages, and columns a page never touches are
+# never paged in at all
+@st.cache_resource(max_entries=2, show_spinner="Opening medication catalogue...")
+def _mapped_catalogue(path, signature):
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+# Fallback when the catalogue has not been imported yet: merge the CSVs in memory
+@st.cache_resource(max_entries=2, show_spinner="Merging medication datasets...")
+def _merged_catalogue(paths, signature):
+    return pa.Table.from_pandas(merge_datasets(load_datasets(paths)), preserve_index=False)
+
+
+# Function for deciding whether load_catalogue maps the Arrow file: it must
+# exist and match the CSVs (without the CSVs it is used as it is)
+def _use_catalogue_file(path, csv_paths):
+    if not all(os.path.exists(csv_path) for csv_path in csv_paths):
+        return os.path.exists(path)
+    return _catalogue_matches(path, csv_paths)
+
+
+# Function for opening the merged catalogue, optionally restricted to the
+# columns a page needs. The Arrow file is built from the CSVs on first use,
+# rebuilt whenever a CSV's content changes, and mapped in between; only when it
+# cannot be written are the CSVs merged in this process's memory.
+@timed("catalogue.load")
+def load_catalogue(columns=None, path=CATALOGUE_FILE, csv_paths=DATASET_FILES):
+    if all(os.path.exists(csv_path) for csv_path in csv_paths) and not catalogue_is_current(path, csv_paths):
+        try:
+            with st.spinner("Building the medication catalogue..."):
+                build_catalogue(path, csv_paths)
+        except OSError:
+            pass  # Read-only folder: fall back to the in-memory merge below
+    if _use_catalogue_file(path, csv_paths):
+        table = _mapped_catalogue(path, file_signature(path))
+    else:
+        table = _merged_catalogue(tuple(csv_paths), dataset_signature(csv_paths))
+    return table.select(columns) if columns is not None else table
+
+
+# Index arrays are views straight into the mapped file, like the catalogue's
+# columns, so every worker shares one copy through the page cache. Returns the
+# catalogue signature the file records, with the arrays.
+@st.cache_resource(max_entries=2, show_spinner="Opening medication indexes...")
+def _mapped_indexes(path, signature):
+    batch = pa.ipc.open_file(pa.memory_map(path, 'r')).get_batch(0)
+    arrays = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        values = column.values
+        arrays[name] = values if pa.types.is_large_string(values.type) else values.to_numpy()
+    return (batch.schema.metadata or {}).get(CATALOGUE_KEY, b'').decode('ascii'), arrays
+
+
+# Function for the index arrays of catalogue version `version` (from
+# catalogue_signature()) for RecordStore, MedicationSearchIndex and
+# CrossReferenceIndex, mapped from the index file. Returns None unless that
+# version is the mapped catalogue file and the index file was built from it, in
+# which case the caller builds the indexes itself.
+def load_indexes(version, path=CATALOGUE_FILE):
+    indexes = index_path(path)
+    if version is None or not os.path.exists(indexes):
+        return None
+    built_for, arrays = _mapped_indexes(indexes, file_signature(indexes))
+    return arrays if (built_for,) == tuple(version) else None
+
+
+# Function for the version of whichever catalogue load_catalogue opens
+def catalogue_signature(path=CATALOGUE_FILE, csv_paths=DATASET_FILES):
+    if _use_catalogue_file(path, csv_paths):
+        return (file_signature(path),)
+    return dataset_signature(csv_paths)
+
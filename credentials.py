@@ -0,0 +1,138 @@
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TIERS = ('prime', 'elite')
+# scrypt cost: about 16 MB and 30-60 ms per hash. Stored hashes carry their own
+# parameters, so raising these only affects passwords set afterwards.
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+SALT_BYTES = 16
+# Logins hashing at once per process; more would only queue for the same cores
+LOGIN_WORKERS = min(4, os.cpu_count() or 1)
+# The demo accounts listed in the README, created when the user store is empty
+DEFAULT_USERS = (('prime', 'primepass', 'prime'), ('elite', 'elitepass', 'elite'))
+TOKEN_CACHE_SIZE = 4096  # Verified session tokens whose entitlements are kept decoded
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+# Function for a salted scrypt hash of `password`, encoded with its parameters
+# as "scrypt$n$r$p$salt$hash"
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=SCRYPT_MAXMEM)
+    return f"scrypt${n}${r}${p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+# Function for checking `password` against a hash from hash_password (the
+# comparison takes the same time wherever the hashes differ)
+def verify_password(password, encoded):
+    try:
+        scheme, n, r, p, salt, key = encoded.split('$')
+        n, r, p, salt, key = int(n), int(r), int(p), _b64decode(salt), _b64decode(key)
+    except ValueError:
+        return False
+    if scheme != 'scrypt':
+        return False
+    derived = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=SCRYPT_MAXMEM, dklen=len(key))
+    return hmac.compare_digest(derived, key)
+
+
+# What a signed session token grants: the user, their tier and when it expires
+# (Unix time)
+Entitlements = collections.namedtuple('Entitlements', ['username', 'tier', 'expires'])
+
+
+# User accounts with scrypt-hashed passwords, kept in the users table of a
+# Storage. scrypt takes tens of milliseconds of CPU, so logins are hashed on a
+# small thread pool: hashlib releases the GIL while hashing, so other sessions'
+# reruns keep going, and a burst of logins queues instead of oversubscribing
+# the cores.
+class CredentialStore:
+    def __init__(self, storage, workers=LOGIN_WORKERS):
+        self.storage = storage
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login')
+        # Unknown usernames are checked against this, so they take as long as a wrong password
+        self._unknown_user_hash = hash_password(secrets.token_urlsafe(16))
+
+    # Function for creating the demo accounts when there are no users yet
+    def seed(self, users=DEFAULT_USERS):
+        if self.storage.count_users():
+            return
+        for username, password, tier in users:
+            self.storage.add_user(username, hash_password(password), tier)
+
+    # Function for creating or updating an account
+    def set_user(self, username, password, tier):
+        if tier not in TIERS:
+            raise ValueError(f"Unknown tier {tier!r} (expected one of {', '.join(TIERS)})")
+        if not username or not password:
+            raise ValueError("Username and password must not be empty")
+        return self.storage.set_user(username, hash_password(password), tier)
+
+    # Function for the tier of a user whose password matches, else None
+    # (blocking; runs the KDF on the calling thread)
+    def check(self, username, password):
+        user = self.storage.get_user(username) if username else None
+        valid = verify_password(password, user['password_hash'] if user else self._unknown_user_hash)
+        return user['tier'] if valid and user else None
+
+    # Function for checking a login on the hashing pool; the Future resolves
+    # to the user's tier, or None when the credentials are wrong
+    def submit_login(self, username, password):
+        return self._pool.submit(self.check, username, password)
+
+    def close(self):
+        self._pool.shutdown()
+
+
+# Issues and verifies HMAC-SHA256 signed session tokens carrying a user's
+# entitlements. Verifying a token recomputes its signature and compares it in
+# constant time; the decoded entitlements of tokens already seen are cached,
+# so a rerun costs one HMAC rather than a password check.
+class SessionSigner:
+    def __init__(self, key, max_age_seconds):
+        self._key = key.encode('utf-8') if isinstance(key, str) else key
+        self.max_age_seconds = max_age_seconds
+        self._verified = {}  # token -> Entitlements
+
+    def _signature(self, payload):
+        return _b64encode(hmac.new(self._key, payload.encode('utf-8'), hashlib.sha256).digest())
+
+    # Function for a token granting `tier` to `username` until max_age_seconds from now
+    def issue(self, username, tier):
+        claims = {'u': username, 't': tier, 'exp': int(time.time()) + self.max_age_seconds}
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return f"{payload}.{self._signature(payload)}"
+
+    # Function for the entitlements of a token, or None when it is forged,
+    # malformed or expired
+    def verify(self, token):
+        payload, _, signature = token.rpartition('.')
+        if not hmac.compare_digest(self._signature(payload).encode('ascii'), signature.encode('utf-8')):
+            return None
+        entitlements = self._verified.get(token)
+        if entitlements is None:
+            claims = json.loads(_b64decode(payload))
+            entitlements = Entitlements(claims['u'], claims['t'], claims['exp'])
+            if len(self._verified) >= TOKEN_CACHE_SIZE:
+                self._verified.clear()
+            self._verified[token] = entitlements
+        if entitlements.expires < time.time():
+            return None
+        return entitlements
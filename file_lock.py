@@ -0,0 +1,56 @@
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Exclusive lock shared by every process on the host, held on a lock file
+# (created when missing). The operating system drops it when the holder exits,
+# so a crashed worker never leaves it stuck. Not reentrant.
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    @property
+    def locked(self):
+        return self._file is not None
+
+    # Function for taking the lock; without `blocking`, returns False at once
+    # when another process holds it
+    def acquire(self, blocking=True):
+        file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            file.close()
+            if blocking:
+                raise
+            return False
+        self._file = file
+        return True
+
+    def release(self):
+        file, self._file = self._file, None
+        if file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            file.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
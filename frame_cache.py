@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+HASH_WIDTH = 8  # dHash compares 9 columns pairwise per row: 8 x 8 = 64 bits
+_SAMPLES = 4  # Pixels sampled per hash cell along each axis before averaging
+_MISS = object()
+
+
+# Function for the 64-bit difference hash (dHash) of an RGB frame. Only a
+# 32 x 36 grid of pixels is read, so it costs microseconds even at 1080p;
+# near-identical frames (a box held still in front of the camera) land within
+# a few bits of each other.
+def dhash(img):
+    height, width = img.shape[:2]
+    rows = np.linspace(0, height - 1, HASH_WIDTH * _SAMPLES).astype(np.intp)
+    cols = np.linspace(0, width - 1, (HASH_WIDTH + 1) * _SAMPLES).astype(np.intp)
+    sample = img[rows[:, None], cols[None, :]]
+    gray = sample[..., :3].mean(axis=2) if sample.ndim == 3 else sample.astype(float)
+    small = gray.reshape(HASH_WIDTH, _SAMPLES, HASH_WIDTH + 1, _SAMPLES).mean(axis=(1, 3))
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+# Function for the number of differing bits between two hashes
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# Bounded LRU cache of recognition results keyed by perceptual frame hash. A
+# lookup hits when a stored hash is within max_distance bits of the frame's
+# hash and younger than ttl seconds; the scan is over at most max_entries
+# integers, far cheaper than running the recognizer.
+class FrameResultCache:
+    def __init__(self, max_entries=32, max_distance=6, ttl=3.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # hash -> (result, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Function for looking up a frame hash; returns (found, result)
+    def get(self, frame_hash):
+        now = self.clock()
+        with self._lock:
+            # Entries are stored in time order, so most expired ones sit at the front
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if now - self._entries[oldest][1] <= self.ttl:
+                    break
+                del self._entries[oldest]
+
+            match, best = _MISS, self.max_distance + 1
+            for stored, (result, stored_at) in reversed(self._entries.items()):  # Newest first
+                if now - stored_at > self.ttl:
+                    continue  # Moved to the back by a hit, but too old to trust
+                distance = hamming(stored, frame_hash)
+                if distance < best:
+                    match, best = stored, distance
+                    if distance == 0:
+                        break
+
+            if match is _MISS:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(match)
+            return True, self._entries[match][0]
+
+    # Function for storing the recognition result of a frame hash
+    def put(self, frame_hash, result):
+        with self._lock:
+            self._entries[frame_hash] = (result, self.clock())
+            self._entries.move_to_end(frame_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Function for the hit/miss counters
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from catalogue import CATALOGUE_FILE, DATASET_FILES, dataset_signature, merge_datasets, read_dataset, write_catalogue
+from file_lock import FileLock
+
+
+# One-shot import: merge the medication CSVs into the columnar catalogue file
+# and its index file, which the app memory-maps on startup. Re-run it whenever
+# the CSVs change; it is safe to run while the app is serving (running workers
+# switch to the new files on their next load).
+def main():
+    parser = argparse.ArgumentParser(description="Convert the medication CSVs into a merged Arrow catalogue.")
+    parser.add_argument("csv_files", nargs="*", default=list(DATASET_FILES), help="datasets, in source-bit order")
+    parser.add_argument("-o", "--output", default=CATALOGUE_FILE, help="catalogue file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    signature = dataset_signature(args.csv_files)
+    frames = [read_dataset(path) for path in args.csv_files]
+    merged = merge_datasets(frames)
+    with FileLock(f"{args.output}.lock"):  # Not while a worker is building it
+        write_catalogue(merged, args.output, signature)
+
+    read_rows = sum(len(frame) for frame in frames)
+    print(f"Read {read_rows} rows from {len(frames)} files, wrote {len(merged)} rows "
+          f"to {args.output} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from search_index import normalize_name
+
+SIDE_EFFECT_COLUMNS = ('sideEffect0', 'sideEffect1', 'sideEffect2')
+CLASS_COLUMN = 'Therapeutic Class'
+
+
+# Function for the values of a catalogue column at the given rows, trimmed,
+# as an object array (None where missing or blank)
+def _column_values(table, column, rows):
+    if column not in table.column_names:
+        return np.full(len(rows), None, dtype=object)
+    values = table.column(column).take(rows)
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(pa.string())
+    values = pc.utf8_trim_whitespace(values)
+    values = pc.if_else(pc.equal(values, ""), pa.scalar(None, pa.string()), values)
+    return values.to_numpy(zero_copy_only=False)
+
+
+# Function for CSR posting lists: the ids carrying term k are
+# indices[indptr[k]:indptr[k + 1]]. `ids` must be non-decreasing so the stable
+# sort leaves every posting list sorted.
+def _postings(codes, ids, size):
+    order = np.argsort(codes, kind="stable")
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=size), out=indptr[1:])
+    return indptr, ids[order].astype(np.int32)
+
+
+# Function for the members of sorted `ids` that are in the sorted posting list
+def _intersect(posting, ids):
+    found = np.searchsorted(posting, ids)
+    found[found == len(posting)] = 0
+    return ids[posting[found] == ids] if len(posting) else ids[:0]
+
+
+# Inverted index from side effect and therapeutic class to the record store's
+# drug ids (see record_store.py), built once per catalogue version, or taken
+# from `arrays` (see arrays()) when it was loaded from the catalogue's index file.
+#
+# Each term's drugs are a sorted CSR posting list, and each drug's own terms
+# are kept in flat arrays (effect_codes[id] holds its three side effect codes,
+# class_codes[id] its class, -1 where missing). Cross-referencing a set of
+# drugs, such as a user's inventory, only looks at the terms those drugs
+# carry and intersects each term's posting list with the set.
+class CrossReferenceIndex:
+    def __init__(self, store, arrays=None):
+        self.store = store
+        if arrays is None:
+            arrays = self._build(store)
+        self.effect_codes = arrays['effect_codes'].reshape(-1, len(SIDE_EFFECT_COLUMNS))
+        self.class_codes = arrays['class_codes']
+        self.effect_indptr, self.effect_indices = arrays['effect_indptr'], arrays['effect_indices']
+        self.class_indptr, self.class_indices = arrays['class_indptr'], arrays['class_indices']
+        # The vocabularies are small, so each process keeps them as Python lists
+        self.side_effects = arrays['side_effects'].to_pylist()
+        self.classes = arrays['classes'].to_pylist()
+
+        self._effect_ids = {term: k for k, term in enumerate(self.side_effects)}
+        self._class_ids = {term: k for k, term in enumerate(self.classes)}
+
+    @staticmethod
+    def _build(store):
+        count = len(store)
+        table = store.table
+        rows = store.rows
+
+        if count:
+            effects = np.column_stack([_column_values(table, column, rows) for column in SIDE_EFFECT_COLUMNS])
+            classes = _column_values(table, CLASS_COLUMN, rows)
+        else:
+            effects = np.empty((0, len(SIDE_EFFECT_COLUMNS)), dtype=object)
+            classes = np.empty(0, dtype=object)
+
+        # One vocabulary for all three side effect columns
+        codes, side_effects = pd.factorize(effects.ravel(), sort=True)
+        effect_codes = codes.reshape(count, len(SIDE_EFFECT_COLUMNS)).astype(np.int32)
+        # A side effect listed twice for one drug is posted once
+        for j in range(1, len(SIDE_EFFECT_COLUMNS)):
+            repeated = (effect_codes[:, [j]] == effect_codes[:, :j]).any(axis=1)
+            effect_codes[repeated, j] = -1
+
+        codes, classes = pd.factorize(classes, sort=True)
+        class_codes = codes.astype(np.int32)
+
+        drug_ids = np.repeat(np.arange(count, dtype=np.int32), len(SIDE_EFFECT_COLUMNS))
+        flat_codes = effect_codes.ravel()
+        valid = flat_codes >= 0
+        effect_indptr, effect_indices = _postings(flat_codes[valid], drug_ids[valid], len(side_effects))
+
+        valid = class_codes >= 0
+        class_indptr, class_indices = _postings(class_codes[valid], np.arange(count, dtype=np.int32)[valid], len(classes))
+
+        return {'effect_codes': flat_codes, 'class_codes': class_codes,
+                'effect_indptr': effect_indptr, 'effect_indices': effect_indices,
+                'class_indptr': class_indptr, 'class_indices': class_indices,
+                'side_effects': pa.array(side_effects.tolist(), type=pa.large_string()),
+                'classes': pa.array(classes.tolist(), type=pa.large_string())}
+
+    # Function for the index's arrays, as written to the index file
+    def arrays(self):
+        return {'effect_codes': self.effect_codes.ravel(), 'class_codes': self.class_codes,
+                'effect_indptr': self.effect_indptr, 'effect_indices': self.effect_indices,
+                'class_indptr': self.class_indptr, 'class_indices': self.class_indices,
+                'side_effects': pa.array(self.side_effects, type=pa.large_string()),
+                'classes': pa.array(self.classes, type=pa.large_string())}
+
+    # Function for the drug ids of a list of medication names; unknown names are skipped
+    def drug_ids(self, med_names):
+        ids = (self.store.name_id(normalize_name(name)) for name in med_names)
+        return np.unique(np.fromiter((i for i in ids if i is not None), dtype=np.int32))
+
+    # Function for every drug id with a side effect
+    def drugs_with_side_effect(self, side_effect):
+        k = self._effect_ids.get(side_effect)
+        return self.effect_indices[:0] if k is None else self.effect_indices[self.effect_indptr[k]:self.effect_indptr[k + 1]]
+
+    # Function for every drug id in a therapeutic class
+    def drugs_in_class(self, therapeutic_class):
+        k = self._class_ids.get(therapeutic_class)
+        return self.class_indices[:0] if k is None else self.class_indices[self.class_indptr[k]:self.class_indptr[k + 1]]
+
+    def _shared(self, ids, own_codes, terms, indptr, indices):
+        ids = np.unique(np.asarray(ids, dtype=np.int32))
+        candidates = np.unique(own_codes[ids])
+        shared = {}
+        for k in candidates[candidates >= 0]:
+            members = _intersect(indices[indptr[k]:indptr[k + 1]], ids)
+            if len(members) > 1:
+                shared[terms[k]] = members
+        return shared
+
+    # Function for the side effects carried by more than one of the given drugs;
+    # returns {side effect: sorted drug ids}
+    def shared_side_effects(self, ids):
+        return self._shared(ids, self.effect_codes, self.side_effects, self.effect_indptr, self.effect_indices)
+
+    # Function for the therapeutic classes held by more than one of the given
+    # drugs; returns {class: sorted drug ids}
+    def duplicate_classes(self, ids):
+        return self._shared(ids, self.class_codes, self.classes, self.class_indptr, self.class_indices)
@@ -0,0 +1,112 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+INVENTORY_COLUMNS = ('medication', 'quantity')
+CHUNK_ROWS = 20000  # Rows parsed, validated and committed at a time
+MAX_QUANTITY = 10**9
+
+
+# Function for the column of `names` matching each inventory column (headers
+# are matched case-insensitively, ignoring surrounding spaces)
+def _header_map(names):
+    found = {str(name).strip().lower(): name for name in names}
+    missing = [column for column in INVENTORY_COLUMNS if column not in found]
+    if missing:
+        raise ValueError(f"Inventory files need a {' and a '.join(missing)} column")
+    return {found[column]: column for column in INVENTORY_COLUMNS}
+
+
+# Function for reading an uploaded CSV or Parquet inventory file as DataFrames
+# of at most `chunk_rows` rows with medication and quantity columns. Only one
+# chunk is in memory at a time, whatever the size of the file.
+def read_inventory_chunks(file, file_name, chunk_rows=CHUNK_ROWS):
+    if file_name.lower().endswith('.parquet'):
+        parquet = pq.ParquetFile(file)
+        columns = _header_map(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(columns)):
+            yield batch.to_pandas().rename(columns=columns).astype({'medication': 'str'})
+        return
+
+    header = pd.read_csv(file, nrows=0).columns
+    columns = _header_map(header)
+    file.seek(0)
+    reader = pd.read_csv(file, usecols=list(columns), dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    for chunk in reader:
+        yield chunk.rename(columns=columns)
+
+
+# Function for validating one chunk against the catalogue's name index.
+# Returns (valid, rejected): valid holds medication (in the catalogue's
+# spelling) and quantity columns ready to upsert; rejected holds the row number
+# (1-based, counting from `first_row`), the original values and an error.
+# Unknown medications are rejected unless `allow_unknown` is set, in which case
+# they are kept with their whitespace tidied.
+def validate_inventory(chunk, store, first_row=1, allow_unknown=False):
+    names = chunk['medication']
+    quantities = pd.to_numeric(chunk['quantity'], errors='coerce').to_numpy(dtype=float)
+    ids = store.lookup_ids(names)
+    blank = (names.fillna('').astype(str).str.strip() == '').to_numpy()
+
+    errors = np.full(len(chunk), None, dtype=object)
+    bad_quantity = ~((quantities >= 0) & (quantities <= MAX_QUANTITY) & (quantities == np.floor(quantities)))
+    errors[bad_quantity] = "quantity must be a whole number of 0 or more"
+    if not allow_unknown:
+        errors[(ids < 0) & ~blank] = "not in the medication catalogue"
+    errors[blank] = "missing medication name"
+
+    keep = pd.isna(errors)
+    medications = np.empty(len(chunk), dtype=object)
+    known = keep & (ids >= 0)
+    medications[known] = store.drug_names(ids[known])
+    unknown = keep & (ids < 0)
+    medications[unknown] = names[unknown].astype(str).str.replace(r"\s+", " ", regex=True).str.strip().to_numpy()
+
+    valid = pd.DataFrame({'medication': medications[keep], 'quantity': quantities[keep].astype(np.int64)})
+    rejected = chunk.loc[~keep, list(INVENTORY_COLUMNS)].assign(error=errors[~keep])
+    rejected.insert(0, 'row', np.flatnonzero(~keep) + first_row)
+    return valid, rejected
+
+
+# Function for importing an inventory file into a user's inventory with upsert
+# semantics (a medication already held gets the file's quantity). Each chunk is
+# committed as one write while the next chunk is parsed and validated (at most
+# one write in flight, so memory stays at about two chunks). A file that fails
+# half way leaves whole chunks imported, and importing it again is safe.
+# `progress(rows_read)` is called after every chunk. Returns (rows imported,
+# DataFrame of rejected rows).
+def import_inventory(storage, user, file, file_name, store, allow_unknown=False, chunk_rows=CHUNK_ROWS, progress=None):
+    imported = 0
+    rows_read = 0
+    rejected = []
+    write = None
+    for chunk in read_inventory_chunks(file, file_name, chunk_rows):
+        valid, bad = validate_inventory(chunk, store, rows_read + 1, allow_unknown)
+        if write is not None:
+            write.result()  # Raises if the previous chunk failed to commit
+            write = None
+        if len(valid):
+            write = storage.submit_inventory(user, zip(valid['medication'].tolist(), valid['quantity'].tolist()))
+            imported += len(valid)
+        if len(bad):
+            rejected.append(bad)
+        rows_read += len(chunk)
+        if progress is not None:
+            progress(rows_read)
+    if write is not None:
+        write.result()
+    if rejected:
+        return imported, pd.concat(rejected, ignore_index=True)
+    return imported, pd.DataFrame(columns=['row', *INVENTORY_COLUMNS, 'error'])
+
+
+# Function for a user's inventory as file contents: 'csv' or 'parquet'
+def export_inventory(storage, user, file_format='csv'):
+    frame = pd.DataFrame(storage.list_inventory(user), columns=list(INVENTORY_COLUMNS))
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return frame.to_csv(index=False).encode('utf-8')
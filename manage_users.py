@@ -0,0 +1,36 @@
+import argparse
+import getpass
+import sys
+
+from credentials import TIERS, CredentialStore
+from storage import Storage
+
+
+# Account administration: create a user or reset their password and tier.
+# Passwords are read from the terminal and only their scrypt hash is stored.
+# The demo accounts are only created while the store is empty, so adding a
+# user first keeps them out of a real deployment.
+def main():
+    parser = argparse.ArgumentParser(description="Create or update an account in the app's user store.")
+    parser.add_argument("username")
+    parser.add_argument("--tier", choices=TIERS, required=True)
+    args = parser.parse_args()
+
+    password = getpass.getpass(f"Password for {args.username}: ")
+    if password != getpass.getpass("Repeat password: "):
+        sys.exit("Passwords do not match")
+
+    storage = Storage()
+    store = CredentialStore(storage, workers=1)
+    try:
+        store.set_user(args.username, password, args.tier)
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        store.close()
+        storage.close()
+    print(f"Saved {args.username} ({args.tier})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import cProfile
+import functools
+import io
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+RING_SIZE = 1024  # Latest samples kept per metric
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS_FILE = 'metrics.prom'
+PROFILE_LINES = 25  # Rows of cProfile output kept per capture
+
+
+# Latest `size` latencies of one metric. record() claims a slot from an
+# itertools.count (atomic under the GIL) and writes one float, so hot paths on
+# any thread never take a lock; readers copy the buffer and may see a sample
+# being overwritten, which is fine for percentiles.
+class LatencyRing:
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self._samples = np.zeros(size)
+        self._slots = itertools.count()
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        slot = next(self._slots)
+        self._samples[slot % self.size] = seconds
+        self.count = slot + 1
+        self.total += seconds  # Racy, but only feeds the lifetime mean
+
+    # Function for a copy of the samples currently in the ring
+    def samples(self):
+        return self._samples[:min(self.count, self.size)].copy()
+
+
+# Registry of named latency rings with optional one-shot profiling.
+#
+# Hot paths use timer() (a context manager) or timed() (a decorator); both cost
+# two perf_counter() calls and one record(). Asking for profile_next(name)
+# makes the next timed call of that metric run under cProfile and tracemalloc,
+# and keeps the report in profiles[name].
+class Metrics:
+    def __init__(self, ring_size=RING_SIZE):
+        self.ring_size = ring_size
+        self._rings = {}
+        self._lock = threading.Lock()  # Only taken when a metric is first seen
+        self._profile_requests = set()
+        self.profiles = {}
+
+    def ring(self, name):
+        ring = self._rings.get(name)
+        if ring is None:
+            with self._lock:
+                ring = self._rings.setdefault(name, LatencyRing(self.ring_size))
+        return ring
+
+    def record(self, name, seconds):
+        self.ring(name).record(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        if self._profile_requests and name in self._profile_requests:
+            with self._profiled(name):
+                yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ring(name).record(time.perf_counter() - start)
+
+    # Function for a decorator that times every call of a function
+    def timed(self, name):
+        def decorator(func):
+            ring = self.ring(name)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if self._profile_requests and name in self._profile_requests:
+                    with self._profiled(name):
+                        return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    ring.record(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    # Function for profiling the next call timed under `name`
+    def profile_next(self, name):
+        self._profile_requests.add(name)
+
+    @contextmanager
+    def _profiled(self, name):
+        self._profile_requests.discard(name)
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - before
+            if not tracing:
+                tracemalloc.stop()
+            self.ring(name).record(elapsed)
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            self.profiles[name] = {
+                "seconds": elapsed,
+                "peak_bytes": max(peak, 0),
+                "captured_at": time.time(),
+                "report": report.getvalue(),
+            }
+
+    # Function for count, mean, max and p50/p95/p99 (in seconds) of every metric
+    def snapshot(self):
+        summary = {}
+        for name, ring in sorted(list(self._rings.items())):
+            samples = ring.samples()
+            if not len(samples):
+                continue
+            stats = {"count": ring.count, "mean": ring.total / ring.count, "max": float(samples.max())}
+            for q, value in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                stats[f"p{int(q * 100)}"] = float(value)
+            summary[name] = stats
+        return summary
+
+    # Function for the snapshot in the Prometheus text exposition format
+    def to_prometheus(self, prefix="medapp"):
+        lines = [
+            f"# HELP {prefix}_latency_seconds Latency of instrumented code paths (latest {self.ring_size} samples).",
+            f"# TYPE {prefix}_latency_seconds summary",
+        ]
+        for name, stats in self.snapshot().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{prefix}_latency_seconds{{path="{label}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]:.9f}')
+            lines.append(f'{prefix}_latency_seconds_sum{{path="{label}"}} {stats["mean"] * stats["count"]:.9f}')
+            lines.append(f'{prefix}_latency_seconds_count{{path="{label}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    # Function for one JSON line holding a timestamped snapshot
+    def to_jsonl(self):
+        return json.dumps({"timestamp": time.time(), "metrics": self.snapshot()}) + "\n"
+
+    # Function for exporting to a file: .jsonl files get a snapshot appended,
+    # anything else is overwritten with Prometheus text (for a textfile collector)
+    def export(self, path=METRICS_FILE):
+        if path.endswith(".jsonl"):
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(self.to_jsonl())
+            return path
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+        os.replace(temp_path, path)  # Scrapers never see a half-written file
+        return path
+
+
+# Process-wide registry used by every instrumented module
+metrics = Metrics()
+timer = metrics.timer
+timed = metrics.timed
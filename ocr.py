@@ -0,0 +1,108 @@
+import shutil
+
+import numpy as np
+
+from search_index import normalize_name
+
+# Optional: OCR needs the pytesseract package and the tesseract binary
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+MIN_TOKEN_LENGTH = 4  # Shorter OCR words ("mg", "IP", "10") are noise on their own
+MIN_MATCH_SCORE = 0.5  # Trigram Jaccard similarity needed to accept a match
+
+
+# Function for checking whether local OCR can run on this machine
+def tesseract_available():
+    return pytesseract is not None and shutil.which("tesseract") is not None
+
+
+# Function for listing the distinct trigrams of a normalized string
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Reads text lines off a label image with Tesseract, entirely on the CPU
+class TesseractReader:
+    def __init__(self, min_confidence=40, config="--psm 11"):
+        if not tesseract_available():
+            raise RuntimeError("Tesseract OCR is not installed (pip install pytesseract, plus the tesseract binary)")
+        self.min_confidence = min_confidence
+        self.config = config
+
+    # Function for reading the text lines of an RGB image as lists of words
+    def read_lines(self, img):
+        # Grayscale and downscale large frames; OCR cost grows with pixel count
+        gray = img[..., :3].mean(axis=2).astype(np.uint8)
+        if gray.shape[1] > 1280:
+            step = int(np.ceil(gray.shape[1] / 1280))
+            gray = gray[::step, ::step]
+        data = pytesseract.image_to_data(gray, config=self.config, output_type=pytesseract.Output.DICT)
+
+        lines = {}
+        for i, word in enumerate(data["text"]):
+            word = word.strip()
+            if word and float(data["conf"][i]) >= self.min_confidence:
+                key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                lines.setdefault(key, []).append(word)
+        return list(lines.values())
+
+
+# Approximate drug-name matcher: trigram Jaccard similarity against every name
+# in the search index, computed with NumPy over the index's posting lists. Only
+# names sharing at least one trigram with the query are ever touched.
+class FuzzyNameMatcher:
+    def __init__(self, index, min_score=MIN_MATCH_SCORE):
+        self.index = index
+        self.min_score = min_score
+        # Distinct trigrams per name id, counted from the trigram posting lists
+        self.trigram_counts = np.bincount(index.size_postings(3), minlength=len(index.names))
+
+    # Function for the best-matching name id and its score for one text
+    def best(self, text):
+        grams = _trigrams(normalize_name(text))
+        postings = [posting for posting in map(self.index.posting, grams) if len(posting)]
+        if not postings:
+            return None, 0.0
+
+        hits = np.concatenate(postings)
+        if len(hits) > len(self.trigram_counts) // 8:
+            # Dense: one bincount over every name beats sorting the hits
+            overlap = np.bincount(hits, minlength=len(self.trigram_counts))
+            scores = overlap / (len(grams) + self.trigram_counts - overlap)
+            best = int(scores.argmax())
+            return best, float(scores[best])
+
+        ids, overlap = np.unique(hits, return_counts=True)
+        scores = overlap / (len(grams) + self.trigram_counts[ids] - overlap)
+        best = int(scores.argmax())
+        return int(ids[best]), float(scores[best])
+
+    # Function for matching OCR output (lists of words per line) to a drug name.
+    # Whole lines are tried first since labels usually print the full name on
+    # one line; single words are only tried when no line matched.
+    def match(self, lines):
+        best_id, best_score = None, 0.0
+        texts = [" ".join(words) for words in lines if words]
+        for candidates in (texts, [word for words in lines for word in words if len(word) >= MIN_TOKEN_LENGTH]):
+            for text in candidates:
+                i, score = self.best(text)
+                if i is not None and score > best_score:
+                    best_id, best_score = i, score
+            if best_score >= self.min_score:
+                return self.index.store.record(best_id).drug_name, best_score
+        return None, best_score
+
+
+# Pluggable recognizer for the recognition pipeline: any callable that takes an
+# RGB frame and returns a drug name (or None) can be used instead
+class OcrRecognizer:
+    def __init__(self, reader, matcher):
+        self.reader = reader
+        self.matcher = matcher
+
+    def __call__(self, img):
+        name, score = self.matcher.match(self.reader.read_lines(img))
+        return name
@@ -0,0 +1,132 @@
+import datetime
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from receipts import render_receipt
+
+DELIVERY_COST = 5  # Fixed delivery cost
+PROCESSING_SECONDS = 3.0  # Simulated order processing time
+MAX_PRESCRIPTION_BYTES = 10 * 1024 * 1024
+JOB_RETENTION_SECONDS = 3600  # Finished jobs are forgotten after an hour
+
+# Leading bytes of each accepted prescription file type
+PRESCRIPTION_SIGNATURES = {
+    "pdf": (b"%PDF",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpg": (b"\xff\xd8\xff",),
+}
+
+
+# Function for validating an uploaded prescription; raises ValueError when it is unusable
+def validate_prescription(file_name, data):
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    extension = "jpg" if extension == "jpeg" else extension
+    if extension not in PRESCRIPTION_SIGNATURES:
+        raise ValueError("Prescription must be a PDF, JPG or PNG file.")
+    if not data:
+        raise ValueError("The uploaded prescription is empty.")
+    if len(data) > MAX_PRESCRIPTION_BYTES:
+        raise ValueError("The uploaded prescription is larger than 10 MB.")
+    if not data.startswith(PRESCRIPTION_SIGNATURES[extension]):
+        raise ValueError(f"The uploaded file is not a valid {extension.upper()} file.")
+
+
+# Function for building the order summary table
+def build_order_table(medication_name, quantity, cost_per_unit):
+    medication_cost = cost_per_unit * quantity  # Total cost for medication
+    total_cost = medication_cost + DELIVERY_COST  # Total cost
+    order_data = {
+        "Name": [medication_name, "Delivery"],
+        "Quantity": [quantity, "-"],  # Delivery doesn't have quantity
+        "Cost per Unit": [f"${cost_per_unit:.2f}", "-"],  # Delivery cost doesn't have unit price
+        "Delivery Cost": ["-", f"${DELIVERY_COST:.2f}"],
+        "Total Cost": [f"${medication_cost:.2f}", f"${total_cost:.2f}"]
+    }
+    return pd.DataFrame(order_data), total_cost
+
+
+# One submitted order. Fields are written by the worker thread and only read
+# by the page, so no lock is needed around them.
+class OrderJob:
+    __slots__ = ('job_id', 'medication_name', 'quantity', 'order_date', 'status', 'progress',
+                 'error', 'order_df', 'total_cost', 'receipt', 'finished_at')
+
+    def __init__(self, job_id, medication_name, quantity):
+        self.job_id = job_id
+        self.medication_name = medication_name
+        self.quantity = quantity
+        self.order_date = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.status = "queued"  # queued -> processing -> done | failed
+        self.progress = 0
+        self.error = None
+        self.order_df = None
+        self.total_cost = None
+        self.receipt = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+
+# Processes orders on a shared thread pool. submit() returns a job id straight
+# away; pages poll get() for progress instead of blocking the script thread.
+# With a Storage, each completed order is written to its user's order history
+# by the worker, whether or not any page is still showing the job.
+class OrderProcessor:
+    def __init__(self, max_workers=4, processing_seconds=PROCESSING_SECONDS, storage=None):
+        self.processing_seconds = processing_seconds
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orders")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # Function for queueing an order placed by `user`; returns its job id
+    def submit(self, user, medication_name, quantity, prescription_name, prescription_data):
+        job = OrderJob(uuid.uuid4().hex, medication_name, quantity)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._process, job, user, prescription_name, prescription_data)
+        return job.job_id
+
+    # Function for looking up a job; returns None for unknown or expired ids
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _process(self, job, user, prescription_name, prescription_data):
+        job.status = "processing"
+        try:
+            validate_prescription(prescription_name, prescription_data)
+
+            steps = 20
+            for i in range(steps):
+                time.sleep(self.processing_seconds / steps)  # Simulate processing time
+                job.progress = int((i + 1) * 100 / steps)
+
+            # Random cost per unit (between 5 and 50)
+            cost_per_unit = random.randint(5, 50)
+            job.order_df, job.total_cost = build_order_table(job.medication_name, job.quantity, cost_per_unit)
+            job.receipt = render_receipt(job.order_df, job.order_date)
+            if self.storage is not None:
+                # The job id keeps the order from being recorded twice
+                self.storage.add_order(user, job.order_date, "Medication", job.quantity, job.total_cost,
+                                       medication=job.medication_name, job_id=job.job_id)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
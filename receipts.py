@@ -0,0 +1,115 @@
+import functools
+
+from fpdf import FPDF
+
+from metrics import timed
+
+ORDER_COLUMNS = ("Name", "Quantity", "Cost per Unit", "Delivery Cost", "Total Cost")
+STATEMENT_COLUMNS = ("Order Date", "Item", "Quantity", "Total Cost")
+FONT = "Arial"
+FONT_SIZE = 12
+ROW_HEIGHT = 10
+
+
+# Function for the finished document as bytes, without touching the disk
+# (fpdf 1.x returns a latin-1 str here, fpdf2 a bytearray)
+def pdf_bytes(pdf):
+    data = pdf.output(dest="S")
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+
+# Page layout worked out once per column set: column widths are fitted to the
+# header text with the font's metrics, so rendering a receipt is just placing
+# cells. Templates are cached, see get_template().
+class ReceiptTemplate:
+    def __init__(self, columns, title):
+        self.columns = tuple(columns)
+        self.title = title
+        measure = FPDF()
+        measure.add_page()
+        measure.set_font(FONT, size=FONT_SIZE)
+        usable = measure.w - measure.l_margin - measure.r_margin
+        natural = [measure.get_string_width(column) + 4 for column in self.columns]
+        scale = usable / sum(natural)
+        self.widths = [width * scale for width in natural]
+
+    # Function for starting a document in this template's font
+    def new_document(self):
+        pdf = FPDF()
+        pdf.set_font(FONT, size=FONT_SIZE)
+        return pdf
+
+    # Function for drawing one page of rows (lists of cell values) onto a document
+    def draw_page(self, pdf, rows, subtitle=None, footer=None):
+        pdf.add_page()
+        pdf.set_font(FONT, style="B", size=FONT_SIZE + 4)
+        pdf.cell(0, ROW_HEIGHT, self.title, ln=1)
+        pdf.set_font(FONT, size=FONT_SIZE)
+        if subtitle:
+            pdf.cell(0, ROW_HEIGHT, subtitle, ln=1)
+        pdf.ln(ROW_HEIGHT / 2)
+
+        pdf.set_font(FONT, style="B", size=FONT_SIZE)
+        for column, width in zip(self.columns, self.widths):
+            pdf.cell(width, ROW_HEIGHT, column, border=1)
+        pdf.ln(ROW_HEIGHT)
+        pdf.set_font(FONT, size=FONT_SIZE)
+        for row in rows:
+            for value, width in zip(row, self.widths):
+                pdf.cell(width, ROW_HEIGHT, str(value), border=1)
+            pdf.ln(ROW_HEIGHT)
+
+        if footer:
+            pdf.ln(ROW_HEIGHT / 2)
+            pdf.set_font(FONT, style="B", size=FONT_SIZE)
+            pdf.cell(0, ROW_HEIGHT, footer, ln=1)
+            pdf.set_font(FONT, size=FONT_SIZE)
+
+
+# Function for the cached template of a column set
+@functools.lru_cache(maxsize=8)
+def get_template(columns, title):
+    return ReceiptTemplate(columns, title)
+
+
+# Function for the rows of an order table in template column order
+def _order_rows(order_df):
+    columns = [order_df[column].tolist() if column in order_df else ["-"] * len(order_df) for column in ORDER_COLUMNS]
+    return [list(row) for row in zip(*columns)]
+
+
+# Function for rendering the PDF receipt of an order table, returned as bytes
+@timed("receipts.render_receipt")
+def render_receipt(order_df, order_date=None):
+    template = get_template(ORDER_COLUMNS, "Order Receipt")
+    pdf = template.new_document()
+    template.draw_page(pdf, _order_rows(order_df), subtitle=f"Order Date: {order_date}" if order_date else None)
+    return pdf_bytes(pdf)
+
+
+# Function for rendering many receipts into one document, one page per order.
+# `orders` is a list of (order_df, order_date) pairs.
+@timed("receipts.render_receipts")
+def render_receipts(orders):
+    template = get_template(ORDER_COLUMNS, "Order Receipt")
+    pdf = template.new_document()
+    for order_df, order_date in orders:
+        template.draw_page(pdf, _order_rows(order_df), subtitle=f"Order Date: {order_date}" if order_date else None)
+    return pdf_bytes(pdf)
+
+
+# Function for rendering a statement of order_history entries (dicts with
+# order_date, item, quantity and total_cost) as a single table
+@timed("receipts.render_statement")
+def render_statement(orders, period=None):
+    template = get_template(STATEMENT_COLUMNS, "Order Statement")
+    pdf = template.new_document()
+    rows = [
+        (order["order_date"], order["item"], order["quantity"], f"${order['total_cost']:.2f}")
+        for order in orders
+    ]
+    total = sum(order["total_cost"] for order in orders)
+    # fpdf starts a new page by itself when the table runs past the bottom margin
+    template.draw_page(pdf, rows, subtitle=f"Period: {period}" if period else None,
+                       footer=f"Total: ${total:.2f} across {len(rows)} orders")
+    return pdf_bytes(pdf)
@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+
+from frame_cache import dhash
+from metrics import metrics, timed
+
+
+# Latest recognition published by the pipeline
+class DetectionResult:
+    __slots__ = ('name', 'frame_no', 'latency', 'timestamp')
+
+    def __init__(self, name, frame_no, latency, timestamp):
+        self.name = name
+        self.frame_no = frame_no
+        self.latency = latency
+        self.timestamp = timestamp
+
+
+# Recognition pipeline for the webrtc Scan page.
+#
+# The webrtc worker thread only calls video_frame_callback, which counts the
+# frame, rate-limits it and drops it into a small bounded queue (evicting the
+# stale frame already waiting there) before returning it untouched, so the
+# preview never waits on recognition. A pool of worker threads converts the
+# sampled frames with frame.to_ndarray() and runs the recognizer. The newest
+# result is published to a lock-protected slot that the script thread polls
+# with latest(); nothing in here calls Streamlit. With a FrameResultCache,
+# frames that look like a recently recognized one reuse its result instead of
+# running the recognizer again. Workers that see no frame for `idle_seconds`
+# exit on their own (the next frame starts them again), so a session that
+# vanished without calling stop() does not keep threads alive. Every start()
+# and stop() begins a new generation of workers; a worker from an older one
+# (say, still inside a slow recognizer call when stop() gave up waiting for
+# it) exits as soon as it returns, and never publishes its result.
+class RecognitionPipeline:
+    def __init__(self, recognizer, every_n_frames=5, max_per_second=4.0, workers=1, queue_size=2, cache=None,
+                 idle_seconds=30.0):
+        self.recognizer = recognizer
+        self.cache = cache
+        self.every_n_frames = max(1, int(every_n_frames))
+        self.min_interval = 1.0 / max_per_second if max_per_second else 0.0
+        self.workers = workers
+        self.idle_seconds = idle_seconds
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._result = None
+        self._threads = []
+        self._running = False
+        self._generation = 0  # Workers whose generation is older exit
+        self._idle = False  # Workers exited for lack of frames, rather than by stop()
+        self._frame_count = 0
+        self._last_submit = 0.0
+        self.stats = {"frames": 0, "sampled": 0, "dropped": 0, "recognized": 0, "errors": 0,
+                      "recognizer_seconds": 0.0}
+
+    # Function for starting the worker pool (no-op when already running)
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._idle = False
+            self._generation += 1
+            self._threads = [
+                threading.Thread(target=self._work, args=(self._generation,), name=f"recognition-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    # Function for stopping the worker pool and discarding queued frames
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._idle = False
+            self._generation += 1
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=1.0)
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                break
+
+    @property
+    def running(self):
+        return self._running
+
+    # Called by streamlit_webrtc on its own thread for every frame
+    @timed("scan.frame_callback")
+    def video_frame_callback(self, frame):
+        self._frame_count += 1
+        self.stats["frames"] += 1
+        if self._idle:
+            self.start()
+        if not self._running or self._frame_count % self.every_n_frames:
+            return frame
+        now = time.monotonic()
+        if now - self._last_submit < self.min_interval:
+            return frame
+        self._last_submit = now
+        self.stats["sampled"] += 1
+
+        item = (self._frame_count, frame)
+        try:
+            self._frames.put_nowait(item)
+        except queue.Full:
+            # Drop the oldest waiting frame so workers always see the freshest one
+            try:
+                self._frames.get_nowait()
+                self.stats["dropped"] += 1
+            except queue.Empty:
+                pass
+            try:
+                self._frames.put_nowait(item)
+            except queue.Full:
+                self.stats["dropped"] += 1
+        return frame
+
+    def _work(self, generation):
+        last_frame = time.monotonic()
+        while self._generation == generation:
+            try:
+                frame_no, frame = self._frames.get(timeout=0.2)
+            except queue.Empty:
+                if time.monotonic() - last_frame > self.idle_seconds:
+                    self._exit_idle()
+                    return
+                continue
+            last_frame = time.monotonic()
+            start = time.perf_counter()
+            try:
+                img = frame.to_ndarray(format="rgb24")
+                found = False
+                if self.cache is not None:
+                    frame_hash = dhash(img)
+                    found, name = self.cache.get(frame_hash)
+                if not found:
+                    name = self.recognizer(img)
+            except Exception:
+                self.stats["errors"] += 1  # A bad frame or a recognizer failure must not kill the worker
+                continue
+            if not found:
+                self.stats["recognized"] += 1
+                self.stats["recognizer_seconds"] += time.perf_counter() - start
+                metrics.record("scan.recognize", time.perf_counter() - start)
+                if self.cache is not None:
+                    self.cache.put(frame_hash, name)
+            result = DetectionResult(name, frame_no, time.perf_counter() - start, time.time())
+            metrics.record("scan.frame", result.latency)
+            with self._lock:
+                if self._generation != generation:
+                    return  # Stopped while recognizing
+                # Workers can finish out of order; never replace a newer result
+                if self._result is None or self._result.frame_no < frame_no:
+                    self._result = result
+
+    # Function for retiring an idle worker; the last one to go marks the pool idle
+    def _exit_idle(self):
+        with self._lock:
+            current = threading.current_thread()
+            if current not in self._threads:
+                return  # stop() already took the pool down
+            self._threads.remove(current)
+            if not self._threads:
+                self._running = False
+                self._idle = True
+
+    # Function for the cache counters plus the recognizer time the cache hits saved
+    def cache_stats(self):
+        if self.cache is None:
+            return None
+        stats = self.cache.stats()
+        recognized = self.stats["recognized"]
+        average = self.stats["recognizer_seconds"] / recognized if recognized else 0.0
+        stats["saved_seconds"] = stats["hits"] * average
+        return stats
+
+    # Function for reading the newest result from the script thread
+    def latest(self):
+        with self._lock:
+            return self._result
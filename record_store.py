@@ -0,0 +1,139 @@
+import bisect
+import collections.abc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from search_index import normalize_name, normalize_names
+
+ALL_SOURCES = 3  # Source bits of a medication found in both datasets
+
+
+# Compact medication record, built on demand from one catalogue row
+class MedicationRecord:
+    __slots__ = ('drug_name', 'therapeutic_class', 'side_effects', 'use', 'source')
+
+    def __init__(self, drug_name, therapeutic_class, side_effects, use, source):
+        self.drug_name = drug_name
+        self.therapeutic_class = therapeutic_class
+        self.side_effects = side_effects
+        self.use = use
+        self.source = source
+
+    @property
+    def found_in_both(self):
+        return self.source == ALL_SOURCES
+
+    def __repr__(self):
+        return f"MedicationRecord({self.drug_name!r})"
+
+
+# Read-only list of the names in an Arrow string array, decoded on access, so
+# a name list mapped from the index file is shared rather than copied into
+# Python strings by every process
+class NameList(collections.abc.Sequence):
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.array[i].to_pylist()
+        return self.array[i].as_py()
+
+
+# Record store keyed by normalized drug name. Each distinct name gets an id (its
+# position in the sorted name list); per-id data lives in flat arrays:
+#   names[id]   - the normalized name
+#   rows[id]    - offset of the first catalogue row with that name
+#   sources[id] - Source bits OR-ed over every row with that name
+# so a lookup is a binary search plus array reads, with no pandas involved.
+# The arrays are built from the table, or taken from `arrays` (see arrays())
+# when they were loaded from the catalogue's index file.
+class RecordStore:
+    def __init__(self, table, arrays=None):
+        self.table = table
+        self._columns = {column: table.column(column) for column in table.column_names} if table is not None else {}
+        if arrays is None:
+            arrays = self._build(table)
+        self.names = NameList(arrays['names'])
+        self.rows = arrays['rows']
+        self.sources = arrays['sources']
+
+    @staticmethod
+    def _build(table):
+        if table is None or 'Drug Name' not in table.column_names:
+            return {'names': pa.array([], type=pa.large_string()), 'rows': np.empty(0, dtype=np.int64),
+                    'sources': np.empty(0, dtype=np.uint8)}
+
+        keys = [normalize_name(name) for name in table.column('Drug Name').to_pylist()]
+        if 'Source' in table.column_names:
+            source = table.column('Source').to_numpy()
+        else:
+            source = np.ones(table.num_rows, dtype=np.uint8)
+        frame = pd.DataFrame({'key': keys, 'row': np.arange(table.num_rows), 'source': source})
+        frame = frame[frame['key'] != '']
+
+        first = frame.groupby('key', sort=True)['row'].min()
+        sources = np.zeros(len(first), dtype=np.uint8)
+        for bit in (1, 2):
+            sources |= (frame['source'] & bit).groupby(frame['key'], sort=True).max().to_numpy().astype(np.uint8)
+        return {'names': pa.array(first.index.tolist(), type=pa.large_string()),
+                'rows': first.to_numpy().astype(np.int64), 'sources': sources}
+
+    # Function for the store's per-id arrays, as written to the index file
+    def arrays(self):
+        return {'names': self.names.array, 'rows': self.rows, 'sources': self.sources}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, med_name):
+        return self.name_id(normalize_name(med_name)) is not None
+
+    # Function for the id of an already normalized name, or None when unknown
+    def name_id(self, key):
+        i = bisect.bisect_left(self.names, key)
+        return i if i < len(self.names) and self.names[i] == key else None
+
+    # Function for building the record of a name id
+    def record(self, i):
+        row = int(self.rows[i])
+        columns = self._columns
+
+        def value(column):
+            return columns[column][row].as_py() if column in columns else None
+
+        return MedicationRecord(
+            value('Drug Name'),
+            value('Therapeutic Class'),
+            (value('sideEffect0'), value('sideEffect1'), value('sideEffect2')),
+            value('use0'),
+            int(self.sources[i]),
+        )
+
+    # Function for looking up a medication by name; returns None when unknown
+    def get(self, med_name):
+        i = self.name_id(normalize_name(med_name))
+        return None if i is None else self.record(i)
+
+    # Function for the ids of many names at once, -1 where a name is unknown
+    # (one vectorized hash lookup instead of a search per name)
+    def lookup_ids(self, med_names):
+        keys = pa.array(normalize_names(med_names), type=pa.large_string())
+        return pc.index_in(keys, value_set=self.names.array).fill_null(-1).to_numpy()
+
+    # Function for the catalogue spelling of each name id
+    def drug_names(self, ids):
+        if not len(ids):
+            return np.empty(0, dtype=object)
+        return self._columns['Drug Name'].take(self.rows[ids]).to_numpy(zero_copy_only=False)
+
+    # Function for checking whether a name appears in both datasets
+    def found_in_both(self, med_name):
+        i = self.name_id(normalize_name(med_name))
+        return i is not None and self.sources[i] == ALL_SOURCES
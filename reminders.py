@@ -0,0 +1,250 @@
+import collections
+import datetime
+import heapq
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from file_lock import FileLock
+from schedule import DoseSchedule, to_datetime64
+
+REMINDER_LOG_FILE = 'reminders.log'
+MAX_WAIT_SECONDS = 60  # Re-check the clock at least this often (sleep, clock changes)
+INBOX_LIVE_SECONDS = 300  # A session that has not drained its inbox for this long is gone
+
+
+# Function for a datetime as whole seconds on the same (local, naive) timeline
+# as DoseSchedule's datetime64 values
+def _seconds(when):
+    return int(to_datetime64(when).astype(np.int64))
+
+
+# One dose that has come due
+class DoseNotification:
+    __slots__ = ('reminder_id', 'user', 'medication', 'dose_time')
+
+    def __init__(self, reminder_id, user, medication, dose_time):
+        self.reminder_id = reminder_id
+        self.user = user
+        self.medication = medication
+        self.dose_time = dose_time
+
+
+# Sink that appends one tab-separated line per dose to a log file. With several
+# worker processes each dispatcher fires every dose, so only the process
+# holding `<path>.lock` writes; another takes over if that process exits.
+class LogFileSink:
+    def __init__(self, path=REMINDER_LOG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writer_lock = FileLock(f"{path}.lock")
+
+    def __call__(self, notification):
+        if not self._writer_lock.locked and not self._writer_lock.acquire(blocking=False):
+            return
+        line = f"{notification.dose_time:%Y-%m-%d %H:%M:%S}\t{notification.user}\t{notification.medication}\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+# Sink that keeps each user's latest notifications until their session picks
+# them up with drain() (the page shows them as toasts). `key` maps a
+# notification's user to the inbox it is delivered to. An open session drains
+# every few seconds, so only users who drained within `live_seconds` get an
+# inbox; notifications for everyone else are dropped, and inboxes left
+# undrained that long are swept away.
+class InboxSink:
+    def __init__(self, max_per_user=20, key=None, live_seconds=INBOX_LIVE_SECONDS, clock=time.monotonic):
+        self.max_per_user = max_per_user
+        self.key = key
+        self.live_seconds = live_seconds
+        self.clock = clock
+        self._inboxes = collections.defaultdict(lambda: collections.deque(maxlen=self.max_per_user))
+        self._drained_at = {}  # user -> clock() at their session's last drain
+        self._swept_at = clock()
+        self._lock = threading.Lock()
+
+    def __call__(self, notification):
+        user = self.key(notification.user) if self.key else notification.user
+        now = self.clock()
+        with self._lock:
+            if now - self._swept_at >= self.live_seconds:
+                self._sweep(now)
+            if now - self._drained_at.get(user, -float('inf')) < self.live_seconds:
+                self._inboxes[user].append(notification)
+
+    # Function for forgetting users whose session has not drained for live_seconds
+    def _sweep(self, now):
+        self._swept_at = now
+        for user in [user for user, drained_at in self._drained_at.items() if now - drained_at >= self.live_seconds]:
+            del self._drained_at[user]
+            self._inboxes.pop(user, None)
+
+    # Function for taking every pending notification of a user (which also
+    # marks their session as live)
+    def drain(self, user):
+        with self._lock:
+            self._drained_at[user] = self.clock()
+            inbox = self._inboxes.pop(user, None)
+        return list(inbox) if inbox else []
+
+
+# Fires reminders when their doses come due, from one background thread.
+#
+# Each reminder has exactly one entry in a min-heap: its next dose. The thread
+# sleeps until the earliest entry is due, pops it, hands a DoseNotification to
+# every sink and pushes the reminder's following dose, so a tick costs
+# O(log n) however many reminders are pending, and nothing is polled. add() is
+# O(log n); cancel() is O(1) and lazy: the entry stays in the heap and is
+# skipped when it surfaces (the heap is compacted once most of it is stale).
+# Nothing is kept that storage cannot rebuild, so after a restart rebuild()
+# reloads every reminder and carries on from the current time. With
+# `sync_seconds`, the thread also checks storage that often and rebuilds when
+# another process has added or removed reminders.
+class ReminderDispatcher:
+    def __init__(self, storage=None, sinks=(), clock=datetime.datetime.now, sync_seconds=None):
+        self.storage = storage
+        self.sinks = list(sinks)
+        self.clock = clock
+        self.sync_seconds = sync_seconds
+        self._heap = []  # (due_seconds, entry_no, reminder_id)
+        self._reminders = {}  # reminder_id -> (entry_no, user, medication, interval_seconds)
+        self._entry_no = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._version = None  # storage.reminders_version() at the last rebuild
+        self._checked_until = None  # Doses up to here (seconds) have been fired
+        self.stats = {"fired": 0, "sink_errors": 0, "syncs": 0}
+
+    def __len__(self):
+        return len(self._reminders)
+
+    # Function for replacing every pending reminder with `reminders` (dicts as
+    # returned by Storage.list_all_reminders(), loaded from storage when None)
+    def rebuild(self, reminders=None):
+        if reminders is None:
+            self._version = self.storage.reminders_version()
+            reminders = self.storage.list_all_reminders()
+        now = to_datetime64(self.clock())
+        if self._checked_until is not None:
+            # Carry on right after the last check, so a rebuild neither skips
+            # nor repeats doses that came due in between
+            now = min(now, np.datetime64(self._checked_until + 1, "s"))
+        schedule = DoseSchedule(reminders, start=now, horizon_hours=0)
+        due = schedule.next_doses(now).astype(np.int64).tolist()
+        intervals = schedule.intervals.astype(np.int64).tolist()
+
+        with self._condition:
+            self._heap = []
+            self._reminders = {}
+            for reminder, due_seconds, interval in zip(reminders, due, intervals):
+                self._entry_no += 1
+                self._reminders[reminder["id"]] = (self._entry_no, reminder["user"], reminder["medication"], interval)
+                self._heap.append((due_seconds, self._entry_no, reminder["id"]))
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    # Function for scheduling one new (or changed) reminder
+    def add(self, reminder):
+        now = _seconds(self.clock())
+        anchor = _seconds(reminder["first_dose_at"])
+        interval = round(reminder["dose_interval_hours"] * 3600)
+        due_seconds = anchor + max(0, -(-(now - anchor) // interval)) * interval  # First dose at or after now
+        with self._condition:
+            self._entry_no += 1
+            self._reminders[reminder["id"]] = (self._entry_no, reminder["user"], reminder["medication"], interval)
+            heapq.heappush(self._heap, (due_seconds, self._entry_no, reminder["id"]))
+            self._condition.notify()
+
+    # Function for dropping a reminder; its heap entry is skipped when popped
+    def cancel(self, reminder_id):
+        with self._condition:
+            self._reminders.pop(reminder_id, None)
+            if len(self._heap) > 2 * len(self._reminders) + 1024:
+                self._compact()
+
+    def _compact(self):
+        live = self._reminders
+        self._heap = [entry for entry in self._heap if entry[2] in live and live[entry[2]][0] == entry[1]]
+        heapq.heapify(self._heap)
+
+    # Function for the seconds until the next pending dose (None when idle)
+    def next_due_in(self):
+        with self._condition:
+            return self._heap[0][0] - _seconds(self.clock()) if self._heap else None
+
+    # Function for starting the dispatcher thread (no-op when already running)
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="reminder-dispatcher", daemon=True)
+        self._thread.start()
+
+    # Function for stopping the dispatcher thread
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        next_sync = time.monotonic() + self.sync_seconds if self.sync_seconds else None
+        while True:
+            if next_sync is not None and time.monotonic() >= next_sync:
+                self._sync()
+                next_sync = time.monotonic() + self.sync_seconds
+            with self._condition:
+                if not self._running:
+                    return
+                fired = self._pop_due(_seconds(self.clock()))
+                if not fired:
+                    wait = self._heap[0][0] - _seconds(self.clock()) if self._heap else MAX_WAIT_SECONDS
+                    if next_sync is not None:
+                        wait = min(wait, next_sync - time.monotonic())
+                    self._condition.wait(min(max(wait, 0), MAX_WAIT_SECONDS))
+                    continue
+            for notification in fired:
+                self._send(notification)
+
+    # Function for rebuilding from storage when its reminders have changed
+    def _sync(self):
+        try:
+            if self.storage.reminders_version() != self._version:
+                self.rebuild()
+                self.stats["syncs"] += 1
+        except sqlite3.Error:
+            pass  # Storage briefly unavailable: keep the current heap and retry next time
+
+    # Function for popping every dose due by `now`, rescheduling each reminder's next dose
+    def _pop_due(self, now):
+        self._checked_until = now
+        fired = []
+        heap, live = self._heap, self._reminders
+        while heap and heap[0][0] <= now:
+            due_seconds, entry_no, reminder_id = heapq.heappop(heap)
+            entry = live.get(reminder_id)
+            if entry is None or entry[0] != entry_no:
+                continue  # Cancelled or replaced
+            _, user, medication, interval = entry
+            dose_time = np.datetime64(due_seconds, "s").astype(datetime.datetime)
+            fired.append(DoseNotification(reminder_id, user, medication, dose_time))
+            next_due = due_seconds + interval
+            if next_due <= now:  # Woken late (sleep, restart): one notification, not a backlog
+                next_due += ((now - next_due) // interval + 1) * interval
+            heapq.heappush(heap, (next_due, entry_no, reminder_id))
+        return fired
+
+    def _send(self, notification):
+        self.stats["fired"] += 1
+        for sink in self.sinks:
+            try:
+                sink(notification)
+            except Exception:
+                self.stats["sink_errors"] += 1  # One broken sink must not stop the others
@@ -0,0 +1,89 @@
+import datetime
+
+import numpy as np
+
+DEFAULT_HORIZON_HOURS = 24 * 7
+
+
+# Function for a datetime (or ISO string) as a whole-second datetime64
+def to_datetime64(value):
+    return np.datetime64(value, "s")
+
+
+# Every dose of a set of reminders inside a time window, expanded at once with
+# datetime64 arithmetic and kept sorted by time. A reminder doses at
+# first_dose_at + k * dose_interval_hours for k = 0, 1, 2, ...; "what is due
+# in the next N minutes" is then two binary searches on the sorted times
+# instead of a loop over reminders.
+#
+# `reminders` is a list of dicts with id, user, medication, first_dose_at and
+# dose_interval_hours, as returned by Storage.list_reminders().
+class DoseSchedule:
+    def __init__(self, reminders, start=None, horizon_hours=DEFAULT_HORIZON_HOURS):
+        self.reminder_ids = np.array([reminder["id"] for reminder in reminders], dtype=np.int64)
+        self.users = np.array([reminder["user"] for reminder in reminders], dtype=object)
+        self.medications = np.array([reminder["medication"] for reminder in reminders], dtype=object)
+        self.anchors = np.array([reminder["first_dose_at"] for reminder in reminders], dtype="datetime64[s]")
+        hours = np.array([reminder["dose_interval_hours"] for reminder in reminders], dtype=float)
+        self.intervals = np.round(hours * 3600).astype("timedelta64[s]")
+
+        self.start = to_datetime64(start or datetime.datetime.now())
+        self.end = self.start + np.timedelta64(int(horizon_hours * 3600), "s")
+        self.times, self.owners = self._expand(self.start, self.end)
+
+    def __len__(self):
+        return len(self.times)
+
+    # Function for the first dose of each reminder at or after `when`
+    def _first_after(self, when):
+        seconds = self.intervals.astype(np.int64)
+        behind = (when - self.anchors).astype(np.int64)
+        steps = np.maximum(0, -(-behind // seconds))  # ceil division, never before the anchor
+        return self.anchors + steps * self.intervals
+
+    def _expand(self, start, end):
+        first = self._first_after(start)
+        seconds = self.intervals.astype(np.int64)
+        room = (end - first).astype(np.int64)
+        counts = np.where(room > 0, (room - 1) // seconds + 1, 0)
+
+        owners = np.repeat(np.arange(len(counts)), counts)
+        steps = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        times = first[owners] + steps * self.intervals[owners]
+        order = np.argsort(times, kind="stable")
+        return times[order], owners[order]
+
+    # Function for the doses in [start, end) as a DataFrame sorted by dose_time
+    def doses(self, start=None, end=None):
+        import pandas as pd  # Only the pages showing doses pay for pandas; the dispatcher does not
+
+        lo = 0 if start is None else np.searchsorted(self.times, to_datetime64(start), side="left")
+        hi = len(self.times) if end is None else np.searchsorted(self.times, to_datetime64(end), side="left")
+        owners = self.owners[lo:hi]
+        return pd.DataFrame({
+            "dose_time": self.times[lo:hi],
+            "reminder_id": self.reminder_ids[owners],
+            "user": self.users[owners],
+            "medication": self.medications[owners],
+        })
+
+    # Function for the doses due between `now` and `within_minutes` from now
+    def due(self, within_minutes, now=None):
+        now = to_datetime64(now or datetime.datetime.now())
+        return self.doses(now, now + np.timedelta64(int(within_minutes * 60), "s"))
+
+    # Function for each reminder's next dose at or after `now`, aligned with the
+    # reminders passed in
+    def next_doses(self, now=None):
+        return self._first_after(to_datetime64(now or datetime.datetime.now()))
+
+    # Function for a dose count per medication per time bucket, ready to chart
+    def timeline(self, freq="h"):
+        import pandas as pd
+
+        doses = self.doses()
+        if doses.empty:
+            return pd.DataFrame()
+        counts = doses.groupby([doses["dose_time"].dt.floor(freq), "medication"]).size().unstack(fill_value=0)
+        buckets = pd.date_range(pd.Timestamp(self.start).floor(freq), pd.Timestamp(self.end), freq=freq, inclusive="left")
+        return counts.reindex(buckets, fill_value=0).rename_axis("dose_time")
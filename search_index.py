@@ -0,0 +1,187 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Longest n-gram kept in the inverted index; queries of 1-3 characters map
+# directly onto a single posting list, longer queries intersect their trigrams
+NGRAM_SIZE = 3
+GRAM_BITS = 21  # Bits per character of a gram code: enough for any code point plus one
+DEFAULT_LIMIT = 50
+
+_WHITESPACE = re.compile(r"\s+")
+_ASCII_WHITESPACE = r"[\t-\r\x{1c}-\x{1f} ]+"  # What \s matches in ASCII text, as an RE2 pattern
+
+
+# Function for normalizing a drug name before indexing or lookup
+def normalize_name(name):
+    if not isinstance(name, str):
+        return ""
+    return _WHITESPACE.sub(" ", name).strip().lower()
+
+
+# Function for normalize_name() over a whole column of strings at once; returns
+# a string Series. ASCII names go through Arrow kernels; the few others take
+# the Python path, whose whitespace and case rules Arrow does not match exactly.
+def normalize_names(names):
+    values = pa.array(pd.Series(names, dtype=object), type=pa.string(), from_pandas=True)
+    tidy = pc.replace_substring_regex(values, _ASCII_WHITESPACE, " ")
+    tidy = pc.ascii_lower(pc.utf8_trim(tidy, " ")).fill_null("")
+    other = pc.invert(pc.fill_null(pc.string_is_ascii(values), True))
+    if pc.any(other).as_py():
+        rows = np.flatnonzero(other.to_numpy(zero_copy_only=False))
+        fixed = [normalize_name(name) for name in values.take(rows).to_pylist()]
+        tidy = pc.replace_with_mask(tidy, other, pa.array(fixed, type=pa.string()))
+    return pd.Series(tidy, dtype="str")
+
+
+# Function for the integer code of an n-gram (1..NGRAM_SIZE characters): each
+# code point plus one in its own GRAM_BITS-bit field, first character lowest.
+# Codes of longer grams are always larger, so sorted codes group grams by size.
+def gram_code(gram):
+    code = 0
+    for j, char in enumerate(gram):
+        code |= (ord(char) + 1) << (GRAM_BITS * j)
+    return code
+
+
+# Function for the n-gram posting lists of a list of names, CSR-style: the
+# sorted distinct gram codes, and for the k-th one the ids of every name
+# containing it as indices[indptr[k]:indptr[k + 1]] (in increasing order).
+# Works on one array of code points for all the names, one n-gram size at a
+# time, so no per-gram Python objects are ever created.
+def ngram_postings(names):
+    lengths = np.fromiter(map(len, names), dtype=np.int32, count=len(names))
+    total = int(lengths.sum(dtype=np.int64))
+    chars = np.zeros(total + NGRAM_SIZE, dtype=np.uint32)
+    chars[:total] = np.frombuffer("".join(names).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    chars[:total] += 1
+    owner = np.repeat(np.arange(len(names), dtype=np.int32), lengths)
+    # Characters from each position to the end of its name, the last included
+    left = np.repeat(np.cumsum(lengths, dtype=np.int32), lengths)
+    left -= np.arange(total, dtype=np.int32)
+
+    term_parts, count_parts, id_parts = [], [], []
+    codes = np.zeros(total, dtype=np.uint64)
+    for size in range(1, NGRAM_SIZE + 1):
+        # Extend every position's gram by the next character
+        codes |= chars[size - 1:size - 1 + total].astype(np.uint64) << np.uint64(GRAM_BITS * (size - 1))
+        keep = left >= size
+        size_codes = codes[keep]
+        # Ids come in increasing order, so a stable sort on the code leaves
+        # each gram's ids sorted, and a name's repeats of a gram adjacent
+        order = np.argsort(size_codes, kind="stable")
+        size_codes = size_codes[order]
+        size_ids = owner[keep][order]
+        del keep, order
+        new_gram = np.empty(len(size_codes), dtype=bool)
+        new_gram[:1] = True
+        np.not_equal(size_codes[1:], size_codes[:-1], out=new_gram[1:])
+        distinct = new_gram.copy()
+        distinct[1:] |= size_ids[1:] != size_ids[:-1]
+        starts = np.flatnonzero(new_gram[distinct])
+        term_parts.append(size_codes[new_gram])
+        count_parts.append(np.diff(starts, append=np.count_nonzero(distinct)))
+        id_parts.append(size_ids[distinct])
+        del size_codes, size_ids, new_gram, distinct
+
+    indptr = np.zeros(sum(len(counts) for counts in count_parts) + 1, dtype=np.int64)
+    np.cumsum(np.concatenate(count_parts), out=indptr[1:])
+    return np.concatenate(term_parts), indptr, np.concatenate(id_parts)
+
+
+# Search index built once over the names of a record store (see record_store.py).
+# Names are stored lower-cased and sorted, so that:
+#   - exact and prefix queries are a bisect into the sorted name list,
+#   - substring queries intersect the n-gram posting lists of the query and
+#     only verify the few surviving candidates.
+# Name ids are positions in the sorted list (the record store's ids), so results
+# inside a tier come out alphabetically without any extra sorting. The posting
+# lists are built from the names, or taken from `arrays` (see arrays()) when
+# they were loaded from the catalogue's index file.
+class MedicationSearchIndex:
+    def __init__(self, store, arrays=None):
+        self.store = store
+        self.names = store.names
+
+        # Posting lists are stored CSR-style: the ids of every name containing
+        # the gram coded terms[k] are indices[indptr[k]:indptr[k + 1]]
+        if arrays is None:
+            self.terms, self.indptr, self.indices = ngram_postings(self.names.array.to_pylist())
+        else:
+            self.terms, self.indptr, self.indices = arrays['gram_terms'], arrays['gram_indptr'], arrays['gram_indices']
+
+    # Function for the posting list arrays, as written to the index file
+    def arrays(self):
+        return {'gram_terms': self.terms, 'gram_indptr': self.indptr, 'gram_indices': self.indices}
+
+    def __len__(self):
+        return len(self.names)
+
+    # Function for the ids of every name containing `gram` (empty when none does)
+    def posting(self, gram):
+        code = gram_code(gram)
+        k = int(np.searchsorted(self.terms, code))
+        if k == len(self.terms) or self.terms[k] != code:
+            return self.indices[:0]
+        return self.indices[self.indptr[k]:self.indptr[k + 1]]
+
+    # Function for the posting lists of every gram of `size` characters, concatenated
+    def size_postings(self, size):
+        first, last = np.searchsorted(
+            self.terms, np.array([1 << (GRAM_BITS * (size - 1)), 1 << (GRAM_BITS * size)], dtype=np.uint64))
+        return self.indices[self.indptr[first]:self.indptr[last]]
+
+    # Candidate ids whose names contain every n-gram of the query
+    def _candidates(self, query):
+        size = min(NGRAM_SIZE, len(query))
+        lists = []
+        for i in range(len(query) - size + 1):
+            posting = self.posting(query[i:i + size])
+            if not len(posting):
+                return posting
+            lists.append(posting)
+        lists.sort(key=len)
+
+        candidates = lists[0]
+        for posting in lists[1:]:
+            if len(candidates) <= 64:
+                break  # Cheaper to verify the rest directly
+            found = np.searchsorted(posting, candidates)
+            found[found == len(posting)] = 0
+            candidates = candidates[posting[found] == candidates]
+        return candidates
+
+    # Function for ranked, capped name search: exact match first, then prefix
+    # matches, then substring matches. Returns a list of name ids.
+    def search(self, query, limit=DEFAULT_LIMIT):
+        query = normalize_name(query)
+        if not query or limit <= 0:
+            return []
+
+        # The exact match and the prefix matches are one run of the sorted
+        # names, the exact match (if any) first
+        i = bisect.bisect_left(self.names, query)
+        prefixed = pc.starts_with(self.names.array.slice(i, limit), query).to_numpy(zero_copy_only=False)
+        results = list(range(i, i + (len(prefixed) if prefixed.all() else int(prefixed.argmin()))))
+        if len(results) >= limit:
+            return results
+
+        # Candidates can number in the hundreds of thousands for one or two
+        # character queries; verify them in chunks so a full page stops early
+        candidates = self._candidates(query)
+        for start in range(0, len(candidates), 512):
+            chunk = candidates[start:start + 512]
+            names = self.names.array.take(chunk)
+            found = pc.and_not(pc.match_substring(names, query), pc.starts_with(names, query))
+            results.extend(chunk[found.to_numpy(zero_copy_only=False)].tolist())
+            if len(results) >= limit:
+                return results[:limit]
+        return results
+
+    # Function for fetching the records behind a list of name ids, in rank order
+    def records(self, ids):
+        return [self.store.record(i) for i in ids]
@@ -0,0 +1,72 @@
+import argparse
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+
+from catalogue import CATALOGUE_FILE, DATASET_FILES, build_catalogue
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RESTART_DELAY = 2.0  # Seconds before a worker that exited is started again
+
+
+# Function for starting one Streamlit worker on `port`
+def start_worker(port, address, cookie_secret):
+    command = [
+        sys.executable, "-m", "streamlit", "run", os.path.join(APP_DIR, "main.py"),
+        "--server.port", str(port),
+        "--server.address", address,
+        "--server.headless", "true",
+    ]
+    # Every worker must accept the others' XSRF cookies
+    return subprocess.Popen(command, env=dict(os.environ, STREAMLIT_SERVER_COOKIE_SECRET=cookie_secret))
+
+
+# Multi-worker mode: N Streamlit processes on consecutive ports, meant to sit
+# behind a load balancer with sticky sessions (see README). They share the
+# memory-mapped catalogue, the SQLite database and the session store, so a
+# user gets the same data, guest id and selected medication from any worker;
+# a login lasts only for the browser session on the worker it was made on.
+def main():
+    parser = argparse.ArgumentParser(description="Run several Streamlit workers that share one catalogue and database.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8501, help="port of the first worker; the rest follow")
+    parser.add_argument("--address", default="127.0.0.1")
+    args = parser.parse_args()
+
+    if os.environ.get("MEDAPP_SESSION_STORE", "sqlite") != "sqlite":
+        sys.exit("Workers can only share sessions through the sqlite session store (unset MEDAPP_SESSION_STORE)")
+
+    os.chdir(APP_DIR)  # The database, catalogue and logs live next to main.py
+    # Build (or refresh) the shared catalogue before the workers start, so none of them spends its first run on it
+    if all(os.path.exists(path) for path in DATASET_FILES):
+        start = time.perf_counter()
+        if build_catalogue():
+            print(f"Built {CATALOGUE_FILE} in {time.perf_counter() - start:.1f}s", flush=True)
+
+    cookie_secret = os.environ.get("MEDAPP_COOKIE_SECRET") or secrets.token_hex(32)
+    ports = [args.port + i for i in range(args.workers)]
+    workers = {port: start_worker(port, args.address, cookie_secret) for port in ports}
+    print(f"Started {args.workers} workers on {args.address}:{ports[0]}-{ports[-1]}", flush=True)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # Stop the workers too
+    try:
+        while True:
+            time.sleep(RESTART_DELAY)
+            for port, worker in workers.items():
+                if worker.poll() is not None:
+                    print(f"Worker on port {port} exited with {worker.returncode}; restarting", flush=True)
+                    workers[port] = start_worker(port, args.address, cookie_secret)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers.values():
+            worker.terminate()
+        for worker in workers.values():
+            worker.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import datetime
+import secrets
+import threading
+
+SESSION_PARAM = 'session'  # Query parameter holding a browser session's token
+# Session state kept in the session store, so it survives reconnects and is
+# the same whichever worker process serves the next run. Anyone holding a
+# page's URL can restore these, so the login token (a credential) is not one
+# of them: a login lasts as long as the browser's Streamlit session.
+SESSION_KEYS = ('guest_id',)
+# The selected medication is kept by name and looked up again on restore
+MEDICATION_KEY = 'medication'
+SESSION_MAX_AGE_DAYS = 30
+
+
+# Function for a new unguessable session token
+def new_session_token():
+    return secrets.token_urlsafe(24)
+
+
+# Session store that keeps sessions in this process only, for a single worker
+# that should not write sessions to disk. Any object with these four methods
+# can serve as the session store; Storage is the default (see storage.py).
+class MemorySessionStore:
+    def __init__(self):
+        self._sessions = {}  # token -> (saved_at, data)
+        self._lock = threading.Lock()
+
+    def load_session(self, token):
+        with self._lock:
+            entry = self._sessions.get(token)
+        return dict(entry[1]) if entry else None
+
+    def save_session(self, token, data):
+        with self._lock:
+            self._sessions[token] = (datetime.datetime.now(), dict(data))
+
+    def delete_session(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def purge_sessions(self, max_age_days):
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+        with self._lock:
+            self._sessions = {token: entry for token, entry in self._sessions.items() if entry[0] >= cutoff}
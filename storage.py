@@ -0,0 +1,431 @@
+import json
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+DATABASE_FILE = 'medication_app.db'
+# Family members own inventory and reminders under the key
+# "<account>/family/<member id>"
+FAMILY_SEPARATOR = '/family/'
+
+# Adds a medication to a user's inventory, or replaces its quantity
+UPSERT_INVENTORY = (
+    "INSERT INTO inventory (user, medication, quantity) VALUES (?, ?, ?) "
+    "ON CONFLICT (user, medication) DO UPDATE SET quantity = excluded.quantity, updated_at = datetime('now')"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    user TEXT NOT NULL,
+    medication TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS inventory_user_medication ON inventory (user, medication);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    medication TEXT NOT NULL,
+    first_dose_time TEXT NOT NULL,
+    dose_interval_hours REAL NOT NULL,
+    next_dose_time TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS reminders_user_medication ON reminders (user, medication);
+
+-- Change counters, bumped by triggers on every write to a watched table, so
+-- other processes can tell when to reload it (row ids are reused after deletes)
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+INSERT INTO table_versions (name, version) VALUES ('reminders', 0) ON CONFLICT (name) DO NOTHING;
+CREATE TRIGGER IF NOT EXISTS reminders_inserted AFTER INSERT ON reminders BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'reminders';
+END;
+CREATE TRIGGER IF NOT EXISTS reminders_updated AFTER UPDATE ON reminders BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'reminders';
+END;
+CREATE TRIGGER IF NOT EXISTS reminders_deleted AFTER DELETE ON reminders BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'reminders';
+END;
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    job_id TEXT UNIQUE,
+    order_date TEXT NOT NULL,
+    item TEXT NOT NULL,
+    medication TEXT,
+    quantity INTEGER NOT NULL,
+    total_cost REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_user_order_date ON orders (user, order_date);
+
+CREATE TABLE IF NOT EXISTS family_members (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    name TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    relationship TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS family_members_user ON family_members (user);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS secrets (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# Function for the user key a family member's data is stored under
+def family_member_user(user, member_id):
+    return f"{user}{FAMILY_SEPARATOR}{member_id}"
+
+
+# Function for the account a user key belongs to (itself unless it is a family member's)
+def account_of(user):
+    return user.split(FAMILY_SEPARATOR, 1)[0]
+
+
+# Function for the reminder columns every reminder query returns. A reminder's
+# first dose is at first_dose_time on the local day it was set.
+def _reminder_columns(alias=""):
+    prefix = f"{alias}." if alias else ""
+    columns = ("id", "user", "medication", "first_dose_time", "dose_interval_hours", "next_dose_time")
+    return (", ".join(prefix + column for column in columns)
+            + f", date({prefix}created_at, 'localtime') || 'T' || {prefix}first_dose_time AS first_dose_at")
+
+
+# SQLite-backed store for every user's inventory, reminders, orders and family
+# members.
+#
+# The database runs in WAL mode, so readers never block the writer or each
+# other; reads borrow a connection from a small pool. All writes go through one
+# writer thread that drains whatever is queued and commits it as a single
+# transaction (group commit), so many sessions writing at once share one fsync
+# instead of queueing on the database lock. Each statement runs under its own
+# savepoint, so a failing write only fails its own caller.
+class Storage:
+    def __init__(self, path=DATABASE_FILE, pool_size=4, max_batch=256):
+        self.path = path
+        self.max_batch = max_batch
+        self._pool = queue.Queue()
+        self._writes = queue.Queue()
+        self._closed = False
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        self._writer = threading.Thread(target=self._write_loop, name="storage-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe with WAL
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    # Function for borrowing a pooled read connection
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    # Function for running a read query; returns a list of dicts
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    # Function for queueing a write; the Future resolves to the row id of the
+    # statement once its batch has committed
+    def submit(self, sql, params=()):
+        return self.submit_all([(sql, params)])
+
+    # Function for queueing several (sql, params) statements that succeed or
+    # fail together; the Future resolves to the row id of the last one
+    def submit_all(self, statements):
+        if self._closed:
+            raise RuntimeError("Storage is closed")
+        if not self._writer.is_alive():
+            raise RuntimeError("Storage writer thread has stopped")
+        future = Future()
+        self._writes.put((statements, future))
+        return future
+
+    # Function for a write that waits for its commit (read-your-writes)
+    def execute(self, sql, params=()):
+        return self.submit(sql, params).result()
+
+    # Writer thread: it must outlive any error, since every caller of
+    # execute() waits on it. Should it die anyway, queued writes are failed
+    # rather than left waiting and submit_all() refuses new ones.
+    def _write_loop(self):
+        conn = self._connect()
+        running = True
+        try:
+            while running:
+                item = self._writes.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        running = False
+                        break
+                    batch.append(item)
+                try:
+                    self._commit(conn, batch)
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+        finally:
+            conn.close()
+            while True:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[1].set_exception(RuntimeError("Storage writer thread has stopped"))
+
+    def _commit(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN")
+            for statements, future in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    for sql, params in statements:
+                        result = conn.execute(sql, params).lastrowid
+                    outcomes.append((future, result, None))
+                    conn.execute("RELEASE write")
+                except Exception as e:  # Bad parameters (e.g. an integer too large) included
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    outcomes.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            outcomes = [(future, None, e) for _, future in batch]
+
+        for future, result, error in outcomes:
+            if future.cancelled():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    # Function for flushing pending writes and closing every connection
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # Inventory
+    def set_inventory(self, user, medication, quantity):
+        return self.execute(UPSERT_INVENTORY, (user, medication, quantity))
+
+    # Function for queueing an upsert of many (medication, quantity) pairs as
+    # one atomic write; later pairs win over earlier ones for the same medication
+    def submit_inventory(self, user, items):
+        return self.submit_all([(UPSERT_INVENTORY, (user, medication, quantity)) for medication, quantity in items])
+
+    # Alphabetical, optionally one page at a time (a limit of -1 returns everything)
+    def list_inventory(self, user, limit=-1, offset=0):
+        return self.query(
+            "SELECT medication, quantity FROM inventory WHERE user = ? ORDER BY medication LIMIT ? OFFSET ?",
+            (user, limit, offset),
+        )
+
+    def count_inventory(self, user):
+        return self.query("SELECT COUNT(*) AS n FROM inventory WHERE user = ?", (user,))[0]["n"]
+
+    # Function for the names of a user's medications, in order; only those
+    # containing `text` (case-insensitive for ASCII) when it is given
+    def inventory_names(self, user, text="", limit=-1):
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.query(
+            "SELECT medication FROM inventory WHERE user = ? AND medication LIKE ? ESCAPE '\\' "
+            "ORDER BY medication LIMIT ?",
+            (user, pattern, limit),
+        )
+        return [row["medication"] for row in rows]
+
+    # Reminders
+    def add_reminder(self, user, medication, first_dose_time, dose_interval_hours, next_dose_time):
+        return self.execute(
+            "INSERT INTO reminders (user, medication, first_dose_time, dose_interval_hours, next_dose_time) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user, medication, first_dose_time.isoformat(), dose_interval_hours, next_dose_time.isoformat()),
+        )
+
+    def list_reminders(self, user):
+        return self.query(f"SELECT {_reminder_columns()} FROM reminders WHERE user = ? ORDER BY id", (user,))
+
+    # Every user's reminders, for building the shared dose schedule
+    def list_all_reminders(self):
+        return self.query(f"SELECT {_reminder_columns()} FROM reminders ORDER BY id")
+
+    # Function for a counter that changes whenever any process adds, edits or
+    # removes a reminder
+    def reminders_version(self):
+        return self.query("SELECT version FROM table_versions WHERE name = 'reminders'")[0]["version"]
+
+    # Orders
+    def add_order(self, user, order_date, item, quantity, total_cost, medication=None, job_id=None):
+        # A job id is recorded at most once, however many reruns report it
+        return self.execute(
+            "INSERT OR IGNORE INTO orders (user, job_id, order_date, item, medication, quantity, total_cost) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user, job_id, order_date, item, medication, quantity, total_cost),
+        )
+
+    def count_orders(self, user):
+        return self.query("SELECT COUNT(*) AS n FROM orders WHERE user = ?", (user,))[0]["n"]
+
+    # Newest first, one page at a time, straight off the (user, order_date) index
+    def list_orders(self, user, limit=20, offset=0):
+        return self.query(
+            "SELECT order_date, item, medication, quantity, total_cost FROM orders "
+            "WHERE user = ? ORDER BY order_date DESC, id DESC LIMIT ? OFFSET ?",
+            (user, limit, offset),
+        )
+
+    def order_months(self, user):
+        rows = self.query(
+            "SELECT DISTINCT substr(order_date, 1, 7) AS month FROM orders WHERE user = ? ORDER BY month DESC",
+            (user,),
+        )
+        return [row["month"] for row in rows]
+
+    def list_orders_in_month(self, user, month):
+        return self.query(
+            "SELECT order_date, item, medication, quantity, total_cost FROM orders "
+            "WHERE user = ? AND order_date >= ? AND order_date < ? ORDER BY order_date",
+            (user, month, month + "~"),  # "~" sorts after every date character
+        )
+
+    # Family members
+    def add_family_member(self, user, name, age, relationship):
+        return self.execute(
+            "INSERT INTO family_members (user, name, age, relationship) VALUES (?, ?, ?, ?)",
+            (user, name, age, relationship),
+        )
+
+    def list_family_members(self, user):
+        return self.query(
+            "SELECT id, name, age, relationship FROM family_members WHERE user = ? ORDER BY id", (user,)
+        )
+
+    # Removes the member together with their inventory and reminders
+    def remove_family_member(self, user, member_id):
+        member_user = family_member_user(user, member_id)
+        return self.submit_all([
+            ("DELETE FROM inventory WHERE user = ?", (member_user,)),
+            ("DELETE FROM reminders WHERE user = ?", (member_user,)),
+            ("DELETE FROM family_members WHERE user = ? AND id = ?", (user, member_id)),
+        ]).result()
+
+    # Every family member's inventory in one query (joined on the member's user
+    # key, so each member is an index probe on inventory)
+    def list_family_inventory(self, user):
+        return self.query(
+            "SELECT f.id AS member_id, f.name AS member, i.medication, i.quantity "
+            "FROM family_members f JOIN inventory i ON i.user = f.user || ? || f.id "
+            "WHERE f.user = ? ORDER BY f.id, i.medication",
+            (FAMILY_SEPARATOR, user),
+        )
+
+    # Every family member's reminders in one query, in list_reminders() form
+    # plus member_id and member
+    def list_family_reminders(self, user):
+        return self.query(
+            f"SELECT f.id AS member_id, f.name AS member, {_reminder_columns('r')} "
+            "FROM family_members f JOIN reminders r ON r.user = f.user || ? || f.id "
+            "WHERE f.user = ? ORDER BY f.id, r.id",
+            (FAMILY_SEPARATOR, user),
+        )
+
+    # Sessions: a browser session's state as a JSON object, keyed by its token,
+    # so any worker process can pick the session up
+    def load_session(self, token):
+        rows = self.query("SELECT data FROM sessions WHERE token = ?", (token,))
+        return json.loads(rows[0]["data"]) if rows else None
+
+    def save_session(self, token, data):
+        return self.execute(
+            "INSERT INTO sessions (token, data) VALUES (?, ?) "
+            "ON CONFLICT (token) DO UPDATE SET data = excluded.data, updated_at = datetime('now')",
+            (token, json.dumps(data)),
+        )
+
+    def delete_session(self, token):
+        return self.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    # Function for dropping sessions not saved for `max_age_days`
+    def purge_sessions(self, max_age_days):
+        return self.execute("DELETE FROM sessions WHERE updated_at < datetime('now', ?)", (f"-{max_age_days} days",))
+
+    # Users: accounts with their password hash (see credentials.py) and tier
+    def get_user(self, username):
+        rows = self.query("SELECT username, password_hash, tier FROM users WHERE username = ?", (username,))
+        return rows[0] if rows else None
+
+    def count_users(self):
+        return self.query("SELECT COUNT(*) AS n FROM users")[0]["n"]
+
+    # Function for creating a user unless the username is taken
+    def add_user(self, username, password_hash, tier):
+        return self.execute(
+            "INSERT INTO users (username, password_hash, tier) VALUES (?, ?, ?) ON CONFLICT (username) DO NOTHING",
+            (username, password_hash, tier),
+        )
+
+    def set_user(self, username, password_hash, tier):
+        return self.execute(
+            "INSERT INTO users (username, password_hash, tier) VALUES (?, ?, ?) "
+            "ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash, tier = excluded.tier",
+            (username, password_hash, tier),
+        )
+
+    # Function for a named secret shared by every worker process: the first
+    # caller stores `default`, everyone gets the stored value
+    def get_secret(self, name, default):
+        self.execute("INSERT INTO secrets (name, value) VALUES (?, ?) ON CONFLICT (name) DO NOTHING", (name, default))
+        return self.query("SELECT value FROM secrets WHERE name = ?", (name,))[0]["value"]